@@ -0,0 +1,139 @@
+"""
+Numeric kernels for the evolution simulations
+
+Every JIT kernel lives here so numba's on-disk cache (cache=True) is
+reused across processes and test runs. Each kernel is warmed with a
+tiny call at import, which loads the cached machine code instead of
+compiling on first use. Without numba the plain NumPy/Python versions
+are used unchanged.
+"""
+from typing import Tuple
+
+import numpy as np
+
+# Optional JIT for numeric kernels
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _jit(**options):
+    """Compile a kernel with the shared options, or leave it as is without numba"""
+    if njit is None:
+        return lambda kernel: kernel
+    # NumPy error semantics avoid division checks in the inner loops
+    return njit(cache=True, fastmath=True, error_model='numpy', **options)
+
+
+# Callers pass the indices, so a bad one raises IndexError instead of reading garbage
+@_jit(boundscheck=True)
+def gradient_stencil(gradient: np.ndarray, x: int, y: int) -> Tuple[float, float]:
+    """8-neighbour gradient direction at (x, y) of a 2D concentration array
+    
+    Positions outside the array have no direction: (0, 0).
+    """
+    h, w = gradient.shape[0], gradient.shape[1]
+    if x < 0 or x >= h or y < 0 or y >= w:
+        return 0.0, 0.0
+    center = gradient[x, y]
+    dx = 0.0
+    dy = 0.0
+    for i in range(-1, 2):
+        nx = x + i
+        if nx < 0 or nx >= h:
+            continue
+        for j in range(-1, 2):
+            ny = y + j
+            if (i == 0 and j == 0) or ny < 0 or ny >= w:
+                continue
+            diff = gradient[nx, ny] - center
+            dx += i * diff
+            dy += j * diff
+    return dx, dy
+
+
+@_jit(boundscheck=True)
+def thermo_batch(positions: np.ndarray, temp_map: np.ndarray, default_temp: float,
+                 optimal: float, temp_range: float):
+    """Sample temperatures at (N, 2) grid positions and grade their deviation.
+    
+    Positions outside the map read default_temp. Returns temperatures, raw
+    intensities in [0, 1] and a hot (1) / cold (0) flag per position.
+    """
+    n = positions.shape[0]
+    h, w = temp_map.shape[0], temp_map.shape[1]
+    temperatures = np.empty(n)
+    intensities = np.empty(n)
+    hot = np.empty(n, dtype=np.int8)
+    for k in range(n):
+        x = positions[k, 0]
+        y = positions[k, 1]
+        temperature = default_temp
+        if 0 <= x < h and 0 <= y < w:
+            temperature = temp_map[x, y]
+        temp_diff = abs(temperature - optimal)
+        intensities[k] = 1.0 if temp_diff > temp_range else temp_diff / temp_range
+        hot[k] = 1 if temperature > optimal else 0
+        temperatures[k] = temperature
+    return temperatures, intensities, hot
+
+
+@_jit()
+def pressure_fitness(optimal: np.ndarray, values: np.ndarray, present: np.ndarray,
+                     strength: float) -> np.ndarray:
+    """Fitness modifier per row of an (N, T) trait matrix.
+    
+    Mirrors SelectionPressure.calculate_fitness_modifier: the mean of
+    1 - |value - optimal| over present traits, scaled by strength around 0.5.
+    Rows with no present traits get 1.0.
+    """
+    n, t = values.shape[0], values.shape[1]
+    if optimal.shape[0] != t or present.shape[0] != n or present.shape[1] != t:
+        raise ValueError("optimal, values and present disagree on the trait count")
+    fitness = np.empty(n)
+    for i in range(n):
+        total = 0.0
+        count = 0
+        for j in range(t):
+            if present[i, j]:
+                total += 1.0 - abs(values[i, j] - optimal[j])
+                count += 1
+        fitness[i] = 1.0 if count == 0 else 1.0 + (total / count - 0.5) * strength
+    return fitness
+
+
+# Array expressions are split across threads under parallel=True
+@_jit(parallel=True)
+def radial_deaths(positions: np.ndarray, epicenter: np.ndarray, radius: float,
+                  mortality_rate: float, draws: np.ndarray) -> np.ndarray:
+    """Death mask for (N, 2) positions around a disaster epicenter.
+    
+    Mortality falls linearly from mortality_rate at the epicenter to zero
+    at radius; draws are the individuals' uniform [0, 1) rolls.
+    """
+    offsets = positions - epicenter
+    distance = np.sqrt(offsets[:, 0] ** 2 + offsets[:, 1] ** 2)
+    return draws < mortality_rate * np.maximum(0.0, 1.0 - distance / radius)
+
+
+def _warm(kernel, *args):
+    """Load (or compile once) kernel at import rather than on first use"""
+    try:
+        kernel(*args)
+    except ImportError:
+        # The on-disk cache was written while this module was imported under
+        # another name (package vs standalone); use an uncached copy instead
+        options = {k: v for k, v in kernel.targetoptions.items() if k != 'nopython'}
+        kernel = njit(**options)(kernel.py_func)
+        kernel(*args)
+    return kernel
+
+
+if njit is not None:
+    gradient_stencil = _warm(gradient_stencil, np.zeros((3, 3)), 1, 1)
+    thermo_batch = _warm(thermo_batch, np.zeros((1, 2), dtype=np.int64), np.zeros((1, 1)),
+                         20.0, 20.0, 40.0)
+    pressure_fitness = _warm(pressure_fitness, np.zeros(1), np.zeros((1, 1)),
+                             np.ones((1, 1), dtype=np.bool_), 1.0)
+    radial_deaths = _warm(radial_deaths, np.zeros((1, 2)), np.zeros(2), 1.0, 0.5, np.zeros(1))
@@ -0,0 +1,40 @@
+"""
+Shared random generator for the evolution simulations
+
+One NumPy Generator is created at import and used for batched draws
+(size=N) instead of per-call generators or per-object state. Set
+BIOCODE_SEED to a positive integer for reproducible runs: it seeds this
+generator and the stdlib random module, which the scalar draws use.
+Unset, 0 or an invalid value leaves both unseeded.
+"""
+import logging
+import os
+import random
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _env_seed() -> Optional[int]:
+    """BIOCODE_SEED as a positive integer, or None"""
+    value = os.environ.get('BIOCODE_SEED', '').strip()
+    if not value:
+        return None
+    try:
+        seed = int(value)
+    except ValueError:
+        logger.warning("Ignoring BIOCODE_SEED=%r: not an integer", value)
+        return None
+    if seed < 0:
+        logger.warning("Ignoring BIOCODE_SEED=%r: must not be negative", value)
+        return None
+    return seed or None
+
+
+_seed = _env_seed()
+if _seed is not None:
+    random.seed(_seed)
+
+rng = np.random.default_rng(_seed)
@@ -2,7 +2,8 @@
 Digital Ecosystem - Multiple Species Interactions
 """
 import numpy as np
-from typing import Dict, List, Optional, Tuple, Set, Any
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple, Set, Any
+from collections.abc import Mapping
 from dataclasses import dataclass, field
 from enum import Enum
 import random
@@ -10,6 +11,12 @@ import math
 from collections import defaultdict
 import logging
 
+try:
+    from ._rng import rng as _rng
+except ImportError:
+    # Fallback for standalone execution
+    from _rng import rng as _rng
+
 logger = logging.getLogger(__name__)
 
 
@@ -128,6 +135,13 @@ class Organism:
         return max(0, min(1, base_value + variation))
 
 
+def _positions(organisms: List[Organism]) -> np.ndarray:
+    """(N, 2) array of organism positions"""
+    if not organisms:
+        return np.empty((0, 2))
+    return np.array([organism.position for organism in organisms], dtype=float)
+
+
 class EcologicalNiche:
     """Represents an ecological niche in the ecosystem"""
     
@@ -181,24 +195,85 @@ class EcologicalNiche:
         return max(0, self.capacity - used)
 
 
+def _set_bits(mask: int) -> Iterator[int]:
+    """Indices of the set bits in mask, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class _PreyView(Mapping):
+    """Read-only predator -> prey species mapping over FoodWeb.prey_masks"""
+    
+    __slots__ = ('_web',)
+    
+    def __init__(self, web: 'FoodWeb'):
+        self._web = web
+        
+    def _mask(self, predator: str) -> int:
+        idx = self._web.species_index.get(predator)
+        return 0 if idx is None else self._web.prey_masks[idx]
+        
+    def __getitem__(self, predator: str) -> FrozenSet[str]:
+        mask = self._mask(predator)
+        if not mask:
+            raise KeyError(predator)
+        species_ids = self._web.species_ids
+        return frozenset(species_ids[idx] for idx in _set_bits(mask))
+    
+    def __contains__(self, predator: object) -> bool:
+        return isinstance(predator, str) and bool(self._mask(predator))
+        
+    def __iter__(self) -> Iterator[str]:
+        species_ids = self._web.species_ids
+        return (species_ids[idx] for idx, mask in enumerate(self._web.prey_masks) if mask)
+    
+    def __len__(self) -> int:
+        return sum(1 for mask in self._web.prey_masks if mask)
+
+
 class FoodWeb:
     """Manages predator-prey relationships"""
     
     def __init__(self):
-        self.predator_prey: Dict[str, Set[str]] = defaultdict(set)  # predator -> prey species
+        # Bit species_index[prey] of prey_masks[species_index[predator]] is set if predator eats prey
+        self.prey_masks: List[int] = []
+        self.predator_prey = _PreyView(self)  # predator -> prey species
         self.prey_predator: Dict[str, Set[str]] = defaultdict(set)  # prey -> predator species
         self.interaction_strengths: Dict[Tuple[str, str], float] = {}
+        # Species id <-> bit position in prey_masks
+        self.species_index: Dict[str, int] = {}
+        self.species_ids: List[str] = []
+        
+    def _index(self, species_id: str) -> int:
+        """Bit index of species_id, registering it on first use"""
+        idx = self.species_index.get(species_id)
+        if idx is None:
+            idx = self.species_index[species_id] = len(self.species_index)
+            self.species_ids.append(species_id)
+            self.prey_masks.append(0)
+        return idx
         
     def add_predation(self, predator: str, prey: str, strength: float = 1.0):
         """Add predator-prey relationship"""
-        self.predator_prey[predator].add(prey)
         self.prey_predator[prey].add(predator)
         self.interaction_strengths[(predator, prey)] = strength
+        pred_idx, prey_idx = self._index(predator), self._index(prey)
+        self.prey_masks[pred_idx] |= 1 << prey_idx
+        
+    def is_prey(self, predator: str, prey: str) -> bool:
+        """Whether predator eats prey"""
+        pred_idx = self.species_index.get(predator)
+        prey_idx = self.species_index.get(prey)
+        if pred_idx is None or prey_idx is None:
+            return False
+        return bool(self.prey_masks[pred_idx] >> prey_idx & 1)
         
     def get_prey_options(self, predator: str) -> List[Tuple[str, float]]:
         """Get available prey with interaction strengths"""
         prey_list = []
-        for prey in self.predator_prey.get(predator, []):
+        for prey in self.predator_prey.get(predator, ()):
             strength = self.interaction_strengths.get((predator, prey), 1.0)
             prey_list.append((prey, strength))
         return prey_list
@@ -270,6 +345,7 @@ class Ecosystem:
     
     def __init__(self, world_size: Tuple[float, float] = (200, 200)):
         self.world_size = world_size
+        self._position_limit = np.nextafter(np.asarray(world_size, dtype=float), 0)
         self.species: Dict[str, Species] = {}
         self.populations: Dict[str, List[Organism]] = defaultdict(list)
         self.food_web = FoodWeb()
@@ -350,20 +426,18 @@ class Ecosystem:
     
     def establish_food_web(self):
         """Automatically establish predator-prey relationships based on trophic levels"""
-        for pred_id, predator in self.species.items():
-            for prey_id, prey in self.species.items():
-                if pred_id == prey_id:
-                    continue
-                    
-                # Check if predation is possible based on trophic levels
-                if predator.trophic_level.value > prey.trophic_level.value:
-                    # Higher trophic level can eat lower
-                    level_diff = predator.trophic_level.value - prey.trophic_level.value
-                    
-                    # Predation more likely between adjacent levels
-                    if level_diff <= 2:
-                        strength = 1.0 / level_diff
-                        self.food_web.add_predation(pred_id, prey_id, strength)
+        species_ids = list(self.species)
+        levels = np.array([self.species[sid].trophic_level.value for sid in species_ids], dtype=float)
+        
+        # Higher trophic level can eat lower; predation only between levels
+        # at most two apart, more likely between adjacent levels
+        level_diff = levels[:, None] - levels[None, :]
+        edible = (level_diff > 0) & (level_diff <= 2)
+        
+        pred_rows, prey_cols = np.nonzero(edible)
+        strengths = 1.0 / level_diff[pred_rows, prey_cols]
+        for pred_idx, prey_idx, strength in zip(pred_rows.tolist(), prey_cols.tolist(), strengths.tolist()):
+            self.food_web.add_predation(species_ids[pred_idx], species_ids[prey_idx], strength)
     
     def simulate_step(self):
         """Simulate one time step of ecosystem dynamics"""
@@ -404,7 +478,7 @@ class Ecosystem:
         if random.random() < 0.05:
             # Storm
             self.environment['humidity'] += random.uniform(0.1, 0.3)
-            self.resources['water'] += np.random.uniform(10, 30, self.world_size)
+            self.resources['water'] += _rng.uniform(10, 30, self.world_size)
     
     def _process_population_dynamics(self, species_id: str):
         """Handle population growth and regulation"""
@@ -486,51 +560,55 @@ class Ecosystem:
     
     def _process_interactions(self, species_id: str):
         """Process species interactions (predation, symbiosis)"""
-        species = self.species[species_id]
-        organisms = self.populations[species_id]
+        hungry = [predator for predator in self.populations[species_id] if predator.energy < 50]
+        if not hungry:
+            return
         
-        for predator in organisms:
-            if predator.energy < 50:  # Hungry
-                # Look for prey
-                prey_options = self.food_web.get_prey_options(species_id)
+        # Snapshot each prey population once: (id, organisms, positions, alive)
+        targets = []
+        for prey_species_id, strength in self.food_web.get_prey_options(species_id):
+            prey_organisms = self.populations.get(prey_species_id)
+            if prey_organisms:
+                targets.append((
+                    prey_species_id, prey_organisms,
+                    _positions(prey_organisms),
+                    np.ones(len(prey_organisms), dtype=bool)
+                ))
+        
+        for predator in hungry:
+            # Hunting range based on size and speed
+            hunt_range = 5 + 5 * predator.get_trait('speed')
+            px, py = predator.position
+            
+            for prey_species_id, prey_organisms, prey_positions, alive in targets:
+                # Find nearby prey
+                dist_sq = (prey_positions[:, 0] - px) ** 2 + (prey_positions[:, 1] - py) ** 2
+                in_range = np.flatnonzero(alive & (dist_sq <= hunt_range * hunt_range))
                 
-                for prey_species_id, strength in prey_options:
-                    if prey_species_id not in self.populations:
-                        continue
-                        
-                    prey_organisms = self.populations[prey_species_id]
+                for idx in in_range:
+                    prey = prey_organisms[idx]
                     
-                    # Find nearby prey
-                    for prey in prey_organisms:
-                        distance = np.sqrt(
-                            (predator.position[0] - prey.position[0])**2 +
-                            (predator.position[1] - prey.position[1])**2
-                        )
+                    # Attempt predation
+                    if self._attempt_predation(predator, prey):
+                        # Consume prey
+                        predator.energy += prey.energy * 0.7
+                        predator.memory.append({
+                            'event': 'successful_hunt',
+                            'prey': prey_species_id,
+                            'location': prey.position
+                        })
+                        alive[idx] = False
                         
-                        # Hunting range based on size and speed
-                        hunt_range = 5 + 5 * predator.get_trait('speed')
+                        # Add to dead matter
+                        x, y = int(prey.position[0]), int(prey.position[1])
+                        self.resources['dead_matter'][x, y] += prey.size * 10
                         
-                        if distance <= hunt_range:
-                            # Attempt predation
-                            hunt_success = self._attempt_predation(predator, prey)
-                            
-                            if hunt_success:
-                                # Consume prey
-                                predator.energy += prey.energy * 0.7
-                                predator.memory.append({
-                                    'event': 'successful_hunt',
-                                    'prey': prey_species_id,
-                                    'location': prey.position
-                                })
-                                
-                                # Remove prey
-                                prey_organisms.remove(prey)
-                                
-                                # Add to dead matter
-                                x, y = int(prey.position[0]), int(prey.position[1])
-                                self.resources['dead_matter'][x, y] += prey.size * 10
-                                
-                                break  # One kill per step
+                        break  # One kill per step
+        
+        # Remove prey
+        for _, prey_organisms, _, alive in targets:
+            if not alive.all():
+                prey_organisms[:] = [prey for prey, keep in zip(prey_organisms, alive) if keep]
     
     def _attempt_predation(self, predator: Organism, prey: Organism) -> bool:
         """Determine if predation attempt succeeds"""
@@ -559,50 +637,54 @@ class Ecosystem:
         """Handle organism movement"""
         species = self.species[species_id]
         organisms = self.populations[species_id]
+        if not organisms:
+            return
         
-        for organism in organisms:
-            # Movement based on various factors
-            move_vector = np.array([0.0, 0.0])
-            
-            # Random walk
-            move_vector += np.random.randn(2) * 0.5
-            
-            # Territorial species stay near territory
-            if species.territorial and organism.territory:
-                center, radius = organism.territory
-                to_center = np.array(center) - np.array(organism.position)
-                if np.linalg.norm(to_center) > radius * 0.8:
-                    move_vector += to_center * 0.1
-            
-            # Social species move towards pack
-            if species.social_structure in ['pack', 'herd'] and organism.pack_members:
-                pack_center = self._get_pack_center(species_id, organism.pack_members)
-                if pack_center:
-                    to_pack = np.array(pack_center) - np.array(organism.position)
-                    move_vector += to_pack * 0.05
-            
-            # Apply movement
-            speed = organism.get_trait('speed') * 2
-            new_position = np.array(organism.position) + move_vector * speed
-            
-            # Keep in bounds
-            new_position[0] = max(0, min(self.world_size[0], new_position[0]))
-            new_position[1] = max(0, min(self.world_size[1], new_position[1]))
-            
-            organism.position = tuple(new_position)
+        # Moves are computed from start-of-step positions for the whole population
+        positions = _positions(organisms)
+        
+        # Random walk
+        moves = _rng.standard_normal((len(organisms), 2)) * 0.5
+        
+        # Territorial species stay near territory
+        if species.territorial:
+            for i, organism in enumerate(organisms):
+                if organism.territory:
+                    center, radius = organism.territory
+                    to_center = np.subtract(center, positions[i])
+                    if np.hypot(to_center[0], to_center[1]) > radius * 0.8:
+                        moves[i] += to_center * 0.1
+        
+        # Social species move towards pack
+        if species.social_structure in ['pack', 'herd']:
+            index = {organism.organism_id: i for i, organism in enumerate(organisms)}
+            for i, organism in enumerate(organisms):
+                if organism.pack_members:
+                    members = [index[m] for m in organism.pack_members if m in index]
+                    if members:
+                        moves[i] += (positions[members].mean(axis=0) - positions[i]) * 0.05
+        
+        # Apply movement
+        speeds = np.fromiter(
+            (organism.get_trait('speed') for organism in organisms), dtype=float, count=len(organisms)
+        )
+        positions += moves * (speeds * 2)[:, None]
+        
+        # Keep in bounds (strictly below world_size so positions index resource grids)
+        np.clip(positions, 0, self._position_limit, out=positions)
+        
+        for organism, position in zip(organisms, positions.tolist()):
+            organism.position = tuple(position)
     
     def _get_pack_center(self, species_id: str, pack_members: Set[str]) -> Optional[Tuple[float, float]]:
         """Get center position of pack members"""
-        positions = []
-        for member_id in pack_members:
-            for organism in self.populations[species_id]:
-                if organism.organism_id == member_id:
-                    positions.append(organism.position)
-                    break
+        positions = [
+            organism.position for organism in self.populations[species_id]
+            if organism.organism_id in pack_members
+        ]
         
         if positions:
-            center_x = np.mean([p[0] for p in positions])
-            center_y = np.mean([p[1] for p in positions])
+            center_x, center_y = np.mean(positions, axis=0)
             return (center_x, center_y)
         return None
     
@@ -619,17 +701,21 @@ class Ecosystem:
             return
         
         # Select parents based on fitness
-        parent_weights = [o.energy * o.health / 10000 for o in organisms]
-        if sum(parent_weights) == 0:
+        # Starving organisms (energy or health below zero) are never chosen
+        parent_weights = [max(0.0, o.energy * o.health / 10000) for o in organisms]
+        if sum(parent_weights) <= 0:
             return
             
-        for _ in range(offspring_count):
-            # Select parents
-            parent1 = random.choices(organisms, weights=parent_weights)[0]
-            parent2 = random.choices(organisms, weights=parent_weights)[0]
+        # Select all parents up front from the current population
+        parents = random.choices(organisms, weights=parent_weights, k=2 * offspring_count)
+        population_size = len(organisms)
+        offspring_batch = []
+        
+        for i in range(offspring_count):
+            parent1, parent2 = parents[2 * i], parents[2 * i + 1]
             
             # Create offspring
-            offspring_id = f"{species_id}_{self.time_step}_{len(organisms) + _}"
+            offspring_id = f"{species_id}_{self.time_step}_{population_size + i}"
             
             # Inherit traits with variation
             trait_variations = {}
@@ -638,10 +724,11 @@ class Ecosystem:
                 variation = random.gauss(0, species.mutation_rate)
                 trait_variations[trait] = parent_avg - species.base_traits[trait] + variation
             
-            # Position near parents
+            # Position near parents, kept inside the world like moved organisms
+            max_x, max_y = self._position_limit.tolist()
             position = (
-                (parent1.position[0] + parent2.position[0]) / 2 + random.uniform(-5, 5),
-                (parent1.position[1] + parent2.position[1]) / 2 + random.uniform(-5, 5)
+                min(max(0.0, (parent1.position[0] + parent2.position[0]) / 2 + random.uniform(-5, 5)), max_x),
+                min(max(0.0, (parent1.position[1] + parent2.position[1]) / 2 + random.uniform(-5, 5)), max_y)
             )
             
             offspring = Organism(
@@ -659,31 +746,32 @@ class Ecosystem:
                 offspring.pack_members.add(parent1.organism_id)
                 offspring.pack_members.add(parent2.organism_id)
             
-            self.populations[species_id].append(offspring)
+            offspring_batch.append(offspring)
+        
+        organisms.extend(offspring_batch)
     
     def _process_mortality(self, species_id: str):
         """Handle death and removal of organisms"""
         species = self.species[species_id]
         organisms = self.populations[species_id]
-        dead = []
+        count = len(organisms)
+        if count == 0:
+            return
         
-        for organism in organisms:
-            # Age-based mortality
-            age_mortality = species.mortality_rate * (1 + organism.age / 100)
-            
-            # Energy depletion
-            if organism.energy <= 0:
-                dead.append(organism)
-                continue
-            
-            # Health-based mortality
-            if organism.health <= 0:
-                dead.append(organism)
-                continue
-            
-            # Stochastic mortality
-            if random.random() < age_mortality:
-                dead.append(organism)
+        ages = np.fromiter((o.age for o in organisms), dtype=float, count=count)
+        energy = np.fromiter((o.energy for o in organisms), dtype=float, count=count)
+        health = np.fromiter((o.health for o in organisms), dtype=float, count=count)
+        
+        # Energy depletion, health-based and stochastic age-based mortality
+        age_mortality = species.mortality_rate * (1 + ages / 100)
+        dead = (energy <= 0) | (health <= 0) | (_rng.random(count) < age_mortality)
+        
+        survivors = []
+        for organism, is_dead in zip(organisms, dead.tolist()):
+            if is_dead:
+                # Add to dead matter
+                x, y = int(organism.position[0]), int(organism.position[1])
+                self.resources['dead_matter'][x, y] += organism.size * organism.energy * 0.1
                 continue
             
             # Update age and energy
@@ -693,13 +781,11 @@ class Ecosystem:
             # Growth
             if organism.size < 1.0:
                 organism.size = min(1.0, organism.size + 0.05)
+            survivors.append(organism)
         
         # Remove dead organisms
-        for organism in dead:
-            organisms.remove(organism)
-            # Add to dead matter
-            x, y = int(organism.position[0]), int(organism.position[1])
-            self.resources['dead_matter'][x, y] += organism.size * organism.energy * 0.1
+        if len(survivors) < count:
+            organisms[:] = survivors
     
     def _process_resource_regeneration(self):
         """Regenerate renewable resources"""
@@ -10,6 +10,8 @@ import sys
 import psutil
 import hashlib
 import json
+import time
+import numpy as np
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Callable
 from pathlib import Path
@@ -37,10 +39,26 @@ except ImportError:
 
 logger = get_logger(__name__)
 
+try:
+    from ._rng import rng as _rng
+except ImportError:
+    # Fallback for standalone execution
+    from _rng import rng as _rng
+
+
+# Values a categorical gene may mutate to
+_GENE_ALTERNATIVES = {
+    'behavior': ('aggressive', 'defensive', 'cooperative', 'neutral'),
+    'metabolism': ('fast', 'efficient', 'adaptive', 'balanced'),
+    'reproduction': ('mitosis', 'budding', 'fragmentation', 'binary_fission'),
+}
+
 
 class DigitalDNA:
     """Genetic information for code generation"""
     
+    __slots__ = ('genes', 'generation', 'lineage_id')
+    
     def __init__(self, genes: Optional[Dict[str, Any]] = None):
         self.genes = genes or {
             'behavior': random.choice(['aggressive', 'defensive', 'cooperative']),
@@ -53,30 +71,36 @@ class DigitalDNA:
         self.generation = 0
         self.lineage_id = hashlib.md5(str(self.genes).encode()).hexdigest()[:8]
     
+    @classmethod
+    def _from_trusted(cls, genes: Dict[str, Any], generation: int,
+                      lineage_id: str) -> 'DigitalDNA':
+        """DNA from already-valid genes, skipping the lineage hash of __init__"""
+        dna = cls.__new__(cls)
+        dna.genes = genes
+        dna.generation = generation
+        dna.lineage_id = lineage_id
+        return dna
+    
     def mutate(self) -> 'DigitalDNA':
         """Create mutated copy of DNA"""
         new_genes = self.genes.copy()
-        
-        # Random mutations
-        for gene, value in new_genes.items():
-            if random.random() < new_genes.get('mutation_rate', 0.05):
-                if isinstance(value, str):
-                    # String mutations - pick from alternatives
-                    alternatives = {
-                        'behavior': ['aggressive', 'defensive', 'cooperative', 'neutral'],
-                        'metabolism': ['fast', 'efficient', 'adaptive', 'balanced'],
-                        'reproduction': ['mitosis', 'budding', 'fragmentation', 'binary_fission']
-                    }
-                    if gene in alternatives:
-                        new_genes[gene] = random.choice(alternatives[gene])
-                elif isinstance(value, (int, float)):
-                    # Numeric mutations - small changes
-                    new_genes[gene] = value * random.uniform(0.8, 1.2)
-        
-        new_dna = DigitalDNA(new_genes)
-        new_dna.generation = self.generation + 1
-        new_dna.lineage_id = self.lineage_id
-        return new_dna
+        mutation_rate = new_genes.get('mutation_rate', 0.05)
+        
+        # Random mutations: pick the mutating genes in one pass, then rewrite only those
+        draws = _rng.random(len(new_genes)).tolist()
+        mutating = [gene for gene, draw in zip(new_genes, draws) if draw < mutation_rate]
+        for gene in mutating:
+            value = new_genes[gene]
+            if isinstance(value, str):
+                # String mutations - pick from alternatives
+                alternatives = _GENE_ALTERNATIVES.get(gene)
+                if alternatives:
+                    new_genes[gene] = random.choice(alternatives)
+            elif isinstance(value, (int, float)):
+                # Numeric mutations - small changes
+                new_genes[gene] = value * random.uniform(0.8, 1.2)
+        
+        return DigitalDNA._from_trusted(new_genes, self.generation + 1, self.lineage_id)
     
     def crossover(self, other: 'DigitalDNA') -> 'DigitalDNA':
         """Sexual reproduction - mix genes from two parents"""
@@ -88,12 +112,79 @@ class DigitalDNA:
             else:
                 child_genes[gene] = self.genes[gene]
         
-        child = DigitalDNA(child_genes)
-        child.generation = max(self.generation, other.generation) + 1
-        child.lineage_id = hashlib.md5(
+        return self._offspring(other, child_genes)
+    
+    def _offspring(self, other: 'DigitalDNA', child_genes: Dict[str, Any]) -> 'DigitalDNA':
+        """Child DNA of self and other carrying child_genes"""
+        lineage_id = hashlib.md5(
             f"{self.lineage_id}+{other.lineage_id}".encode()
         ).hexdigest()[:8]
-        return child
+        return DigitalDNA._from_trusted(
+            child_genes, max(self.generation, other.generation) + 1, lineage_id
+        )
+    
+    @classmethod
+    def batch_crossover(cls, parents_a: List['DigitalDNA'],
+                        parents_b: List['DigitalDNA']) -> List['DigitalDNA']:
+        """crossover() for a whole generation of parent pairs
+        
+        All inheritance coin flips are drawn as one (pairs, genes) mask.
+        """
+        if len(parents_a) != len(parents_b):
+            raise ValueError("parents_a and parents_b must have the same length")
+        if not parents_a:
+            return []
+        
+        width = max(len(parent.genes) for parent in parents_a)
+        from_a = _rng.random((len(parents_a), width)) < 0.5
+        
+        children = []
+        for parent_a, parent_b, row in zip(parents_a, parents_b, from_a.tolist()):
+            genes_b = parent_b.genes
+            child_genes = {
+                gene: value if take_a or gene not in genes_b else genes_b[gene]
+                for (gene, value), take_a in zip(parent_a.genes.items(), row)
+            }
+            children.append(parent_a._offspring(parent_b, child_genes))
+        return children
+
+
+class CellArchive:
+    """Append-only JSON Lines record of cells
+    
+    The file is opened once with O_APPEND and each cell costs a single
+    os.write of pre-serialized bytes, instead of a new file per cell.
+    """
+    
+    def __init__(self, path: str = "digital_life_forms/cells.jsonl"):
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+        
+    def append(self, cell: 'SelfReplicatingCell'):
+        """Record one cell"""
+        if self._fd is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        record = {
+            'cell_id': cell.id,
+            'generation': cell.dna.generation,
+            'lineage': cell.dna.lineage_id,
+            'dna': cell.dna.genes,
+            'mutations': cell.mutations
+        }
+        os.write(self._fd, (json.dumps(record) + "\n").encode())
+        
+    def close(self):
+        """Close the archive file"""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            
+    def __enter__(self) -> 'CellArchive':
+        return self
+        
+    def __exit__(self, *exc_info):
+        self.close()
 
 
 class SelfReplicatingCell(CodeCell):
@@ -107,8 +198,15 @@ class SelfReplicatingCell(CodeCell):
         self.mutations = []
         self.fitness_score = 1.0
         
-    def mitosis(self, save_to_file: bool = False) -> Optional['SelfReplicatingCell']:
-        """Reproduce by cell division"""
+    def mitosis(self, save_to_file: bool = False,
+                archive: Optional[CellArchive] = None,
+                output_dir: Path = Path("digital_life_forms")) -> Optional['SelfReplicatingCell']:
+        """Reproduce by cell division
+        
+        With save_to_file the child is written out as its own Python file
+        in output_dir; passing an archive appends it to that CellArchive
+        instead, which is much cheaper for large populations.
+        """
         if self.age > self.dna.genes['lifespan']:
             logger.info(f"Cell {self.id} too old to reproduce")
             return None
@@ -123,15 +221,18 @@ class SelfReplicatingCell(CodeCell):
         logger.info(f"Cell {self.id} reproduced. Child: {child.id}")
         
         # Optionally save to file system
-        if save_to_file:
-            self._save_to_file(child)
+        if archive is not None:
+            archive.append(child)
+        elif save_to_file:
+            self._save_to_file(child, output_dir)
             
         return child
     
-    def _save_to_file(self, child: 'SelfReplicatingCell'):
+    def _save_to_file(self, child: 'SelfReplicatingCell',
+                      output_dir: Path = Path("digital_life_forms")):
         """Save child cell as actual Python file"""
-        cell_dir = Path("digital_life_forms")
-        cell_dir.mkdir(exist_ok=True)
+        cell_dir = Path(output_dir)
+        cell_dir.mkdir(parents=True, exist_ok=True)
         
         filename = cell_dir / f"cell_{child.id}_{child.dna.generation}.py"
         
@@ -162,6 +263,36 @@ if __name__ == "__main__":
         logger.info(f"Saved cell to {filename}")
 
 
+class StressSampler:
+    """System load for ApoptoticCell.check_stress, refreshed at most once per ttl seconds"""
+    
+    def __init__(self, ttl: float = 0.1):
+        self.ttl = ttl
+        # psutil measures CPU since its previous call, so prime it now;
+        # otherwise the first sample would always read 0.0
+        psutil.cpu_percent(interval=None)
+        self.reset()
+        
+    def reset(self):
+        """Forget the cached reading so the next sample() queries psutil"""
+        self.last_sample = float('-inf')
+        self.cpu_percent = 0.0
+        self.memory_percent = 0.0
+    
+    def sample(self) -> tuple:
+        """(cpu_percent, memory_percent), resampled when older than ttl"""
+        now = time.monotonic()
+        if now - self.last_sample > self.ttl:
+            self.cpu_percent = psutil.cpu_percent(interval=None)
+            self.memory_percent = psutil.virtual_memory().percent
+            self.last_sample = now
+        return self.cpu_percent, self.memory_percent
+
+
+# Shared by every cell so a population costs one psutil query per ttl
+_stress_sampler = StressSampler()
+
+
 class ApoptoticCell(SelfReplicatingCell):
     """A cell that can undergo programmed death"""
     
@@ -170,6 +301,8 @@ class ApoptoticCell(SelfReplicatingCell):
         self.death_signals = []
         self.stress_level = 0
         self._death_triggered = False
+        self.memory_dir = Path("genetic_memory")  # Where programmed_death saves genetic memory
+        self.stress_sampler = _stress_sampler  # Source of system load for check_stress
         
     def receive_death_signal(self, signal: str):
         """Receive apoptosis signal"""
@@ -180,8 +313,7 @@ class ApoptoticCell(SelfReplicatingCell):
     def check_stress(self):
         """Monitor stress and trigger apoptosis if needed"""
         # Check system resources
-        cpu_percent = psutil.cpu_percent(interval=0.1)
-        memory_percent = psutil.virtual_memory().percent
+        cpu_percent, memory_percent = self.stress_sampler.sample()
         
         if cpu_percent > 90 or memory_percent > 90:
             self.stress_level += 1
@@ -213,10 +345,10 @@ class ApoptoticCell(SelfReplicatingCell):
             except Exception as e:
                 logger.error(f"Could not delete cell file: {e}")
     
-    def _save_genetic_memory(self):
-        """Save important genetic information before death"""
-        memory_dir = Path("genetic_memory")
-        memory_dir.mkdir(exist_ok=True)
+    def _save_genetic_memory(self, output_dir: Optional[Path] = None):
+        """Save important genetic information before death (to memory_dir by default)"""
+        memory_dir = Path(output_dir) if output_dir is not None else self.memory_dir
+        memory_dir.mkdir(parents=True, exist_ok=True)
         
         memory_file = memory_dir / f"memory_{self.id}_{datetime.now().isoformat()}.json"
         
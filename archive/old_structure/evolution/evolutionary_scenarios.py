@@ -3,11 +3,23 @@ Evolutionary Scenarios - Disasters, Epidemics, and Selection Pressures
 """
 import random
 import numpy as np
-from typing import Dict, List, Optional, Callable, Any, Tuple
+from typing import Dict, List, Optional, Callable, Any, Tuple, Union
 from enum import Enum
 from dataclasses import dataclass
 import logging
 from datetime import datetime
+from types import MappingProxyType
+
+try:
+    from ._numba_kernels import pressure_fitness as _pressure_fitness, radial_deaths as _radial_deaths
+except ImportError:
+    # Fallback for standalone execution
+    from _numba_kernels import pressure_fitness as _pressure_fitness, radial_deaths as _radial_deaths
+try:
+    from ._rng import rng as _rng
+except ImportError:
+    # Fallback for standalone execution
+    from _rng import rng as _rng
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +38,59 @@ class DisasterType(Enum):
     INVASIVE_SPECIES = "invasion"     # New predator/competitor
 
 
+# Default disaster effects. (base, per_severity) pairs scale as
+# base + per_severity * severity; other values are used as is.
+_DEFAULT_EFFECTS: Dict[DisasterType, Dict[str, Any]] = {
+    DisasterType.METEOR_IMPACT: {
+        'instant_mortality': (0.5, 0.4),
+        'temperature_change': (0.0, -20),
+        'resource_destruction': (0.0, 0.8),
+        'mutation_rate_multiplier': 5.0
+    },
+    DisasterType.VOLCANIC_ERUPTION: {
+        'instant_mortality': (0.1, 0.2),
+        'temperature_change': (0.0, -10),
+        'toxin_increase': (0.0, 30),
+        'light_reduction': (0.0, 0.7)
+    },
+    DisasterType.ICE_AGE: {
+        'temperature_change': (0.0, -15),
+        'resource_reduction': (0.0, 0.5),
+        'metabolism_pressure': 'efficient'
+    },
+    DisasterType.DROUGHT: {
+        'resource_reduction': (0.0, 0.7),
+        'water_scarcity': (0.0, 0.9),
+        'temperature_increase': (0.0, 5)
+    },
+    DisasterType.FLOOD: {
+        'instant_mortality': (0.2, 0.3),
+        'habitat_destruction': (0.0, 0.6),
+        'movement_requirement': True
+    },
+    DisasterType.SOLAR_FLARE: {
+        'radiation_increase': (0.0, 50),
+        'electronics_damage': (0.0, 0.8),
+        'mutation_rate_multiplier': 10.0
+    },
+    DisasterType.PANDEMIC: {
+        'infection_rate': (0.3, 0.5),
+        'mortality_rate': (0.1, 0.4),
+        'immunity_advantage': True
+    },
+    DisasterType.TOXIC_BLOOM: {
+        'toxin_increase': (0.0, 40),
+        'resource_contamination': (0.0, 0.6),
+        'immunity_pressure': True
+    },
+    DisasterType.INVASIVE_SPECIES: {
+        'predation_pressure': (0.0, 0.5),
+        'competition_increase': (0.0, 0.7),
+        'behavior_pressure': 'defensive'
+    }
+}
+
+
 @dataclass
 class Disaster:
     """A disaster event affecting the population"""
@@ -42,57 +107,11 @@ class Disaster:
     
     def _default_effects(self) -> Dict[str, Any]:
         """Get default effects for disaster type"""
-        effects = {
-            DisasterType.METEOR_IMPACT: {
-                'instant_mortality': 0.5 + 0.4 * self.severity,
-                'temperature_change': -20 * self.severity,
-                'resource_destruction': 0.8 * self.severity,
-                'mutation_rate_multiplier': 5.0
-            },
-            DisasterType.VOLCANIC_ERUPTION: {
-                'instant_mortality': 0.1 + 0.2 * self.severity,
-                'temperature_change': -10 * self.severity,
-                'toxin_increase': 30 * self.severity,
-                'light_reduction': 0.7 * self.severity
-            },
-            DisasterType.ICE_AGE: {
-                'temperature_change': -15 * self.severity,
-                'resource_reduction': 0.5 * self.severity,
-                'metabolism_pressure': 'efficient'
-            },
-            DisasterType.DROUGHT: {
-                'resource_reduction': 0.7 * self.severity,
-                'water_scarcity': 0.9 * self.severity,
-                'temperature_increase': 5 * self.severity
-            },
-            DisasterType.FLOOD: {
-                'instant_mortality': 0.2 + 0.3 * self.severity,
-                'habitat_destruction': 0.6 * self.severity,
-                'movement_requirement': True
-            },
-            DisasterType.SOLAR_FLARE: {
-                'radiation_increase': 50 * self.severity,
-                'electronics_damage': 0.8 * self.severity,
-                'mutation_rate_multiplier': 10.0
-            },
-            DisasterType.PANDEMIC: {
-                'infection_rate': 0.3 + 0.5 * self.severity,
-                'mortality_rate': 0.1 + 0.4 * self.severity,
-                'immunity_advantage': True
-            },
-            DisasterType.TOXIC_BLOOM: {
-                'toxin_increase': 40 * self.severity,
-                'resource_contamination': 0.6 * self.severity,
-                'immunity_pressure': True
-            },
-            DisasterType.INVASIVE_SPECIES: {
-                'predation_pressure': 0.5 * self.severity,
-                'competition_increase': 0.7 * self.severity,
-                'behavior_pressure': 'defensive'
-            }
+        severity = self.severity
+        return {
+            name: value[0] + value[1] * severity if type(value) is tuple else value
+            for name, value in _DEFAULT_EFFECTS.get(self.disaster_type, {}).items()
         }
-        
-        return effects.get(self.disaster_type, {})
 
 
 class SelectionPressure:
@@ -105,6 +124,19 @@ class SelectionPressure:
         self.strength = strength  # How strongly it affects fitness
         self.active = True
         self.generations_active = 0
+    
+    @property
+    def trait_preferences(self) -> MappingProxyType:
+        """Read-only trait -> optimal value mapping; assign a new dict to change it"""
+        return self._trait_preferences
+    
+    @trait_preferences.setter
+    def trait_preferences(self, preferences: Dict[str, float]):
+        self._trait_preferences = MappingProxyType(dict(preferences))
+        # Fixed trait order for batch evaluation
+        self.trait_names = tuple(preferences)
+        self.optimal = np.fromiter(self._trait_preferences.values(), dtype=np.float64,
+                                   count=len(self.trait_names))
         
     def calculate_fitness_modifier(self, traits: Dict[str, float]) -> float:
         """Calculate fitness modification based on traits"""
@@ -132,12 +164,42 @@ class SelectionPressure:
         # Apply strength
         return 1.0 + (avg_fitness - 0.5) * self.strength
     
+    def trait_matrix(self, population_traits: List[Dict[str, float]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Pack trait dicts into (N, T) values and presence arrays in trait_names order"""
+        shape = (len(population_traits), len(self.trait_names))
+        values = np.zeros(shape)
+        present = np.zeros(shape, dtype=bool)
+        for i, traits in enumerate(population_traits):
+            for j, trait in enumerate(self.trait_names):
+                value = traits.get(trait)
+                if value is not None:
+                    values[i, j] = value
+                    present[i, j] = True
+        return values, present
+    
+    def calculate_population_fitness(self, population_traits: List[Dict[str, float]]) -> np.ndarray:
+        """calculate_fitness_modifier for a whole population in one kernel call"""
+        if not self.active:
+            return np.ones(len(population_traits))
+        values, present = self.trait_matrix(population_traits)
+        return _pressure_fitness(self.optimal, values, present, float(self.strength))
+    
     def update(self):
         """Update pressure state"""
         if self.active:
             self.generations_active += 1
 
 
+@dataclass(slots=True)
+class ContactNetwork:
+    """Contact network in CSR form: contacts of hosts[i] are
+    hosts[j] for j in indices[indptr[i]:indptr[i + 1]]"""
+    hosts: List[str]
+    host_index: Dict[str, int]
+    indptr: np.ndarray
+    indices: np.ndarray
+
+
 class Pathogen:
     """Disease agent for pandemic scenarios"""
     
@@ -173,40 +235,78 @@ class Pathogen:
             
         return False
     
-    def spread(self, contact_network: Dict[str, List[str]]) -> List[str]:
-        """Spread to connected hosts"""
-        new_infections = []
-        
-        for infected in list(self.infected_hosts):
-            if infected in contact_network:
-                for contact in contact_network[infected]:
-                    if random.random() < self.transmissibility:
-                        if contact not in self.infected_hosts and contact not in self.immune_hosts:
-                            new_infections.append(contact)
+    @staticmethod
+    def compile_network(contact_network: Dict[str, List[str]]) -> ContactNetwork:
+        """Convert a host -> contacts mapping to CSR form for repeated spread() calls"""
+        host_index: Dict[str, int] = {}
+        for host, contacts in contact_network.items():
+            host_index.setdefault(host, len(host_index))
+            for contact in contacts:
+                host_index.setdefault(contact, len(host_index))
+        
+        indptr = np.zeros(len(host_index) + 1, dtype=np.int32)
+        for host, contacts in contact_network.items():
+            indptr[host_index[host] + 1] = len(contacts)
+        np.cumsum(indptr, out=indptr)
+        
+        indices = np.empty(indptr[-1], dtype=np.int32)
+        for host, contacts in contact_network.items():
+            start = indptr[host_index[host]]
+            indices[start:start + len(contacts)] = [host_index[c] for c in contacts]
+        
+        return ContactNetwork(list(host_index), host_index, indptr, indices)
+    
+    def spread(self, contact_network: Union[ContactNetwork, Dict[str, List[str]]]) -> List[str]:
+        """Spread to connected hosts
+        
+        Every contact edge of an infected host transmits with probability
+        transmissibility; all edges are drawn in one batch. Pass a network
+        from compile_network() to skip the conversion on repeated calls.
+        """
+        if not isinstance(contact_network, ContactNetwork):
+            contact_network = self.compile_network(contact_network)
+        host_index = contact_network.host_index
+        rows = np.fromiter(
+            (host_index[host] for host in self.infected_hosts if host in host_index), dtype=np.int32
+        )
+        if rows.size == 0:
+            return []
+        
+        # Gather the out-edges of every infected host
+        starts = contact_network.indptr[rows]
+        lengths = contact_network.indptr[rows + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return []
+        offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        edges = contact_network.indices[offsets + np.arange(total)]
+        
+        transmitted = np.unique(edges[_rng.random(total) < self.transmissibility])
+        hosts = contact_network.hosts
+        new_infections = [
+            hosts[i] for i in transmitted.tolist()
+            if hosts[i] not in self.infected_hosts and hosts[i] not in self.immune_hosts
+        ]
         
         self.infected_hosts.update(new_infections)
         return new_infections
     
     def cause_mortality(self) -> List[str]:
         """Determine which infected hosts die"""
-        deaths = []
-        survivors = []
-        
-        for host in list(self.infected_hosts):
-            if random.random() < self.lethality:
-                deaths.append(host)
-            else:
-                survivors.append(host)
+        hosts = list(self.infected_hosts)
+        draws = _rng.random((2, len(hosts))).tolist()
+        deaths = [host for host, draw in zip(hosts, draws[0]) if draw < self.lethality]
         
         # Remove dead hosts
-        for host in deaths:
-            self.infected_hosts.discard(host)
+        self.infected_hosts.difference_update(deaths)
             
-        # Some survivors gain immunity
-        for host in survivors:
-            if random.random() < 0.3:  # 30% chance to gain immunity
-                self.infected_hosts.discard(host)
-                self.immune_hosts.add(host)
+        # Some survivors gain immunity (30% chance)
+        recovered = [
+            host for host, death_draw, immunity_draw in zip(hosts, *draws)
+            if death_draw >= self.lethality and immunity_draw < 0.3
+        ]
+        self.infected_hosts.difference_update(recovered)
+        self.immune_hosts.update(recovered)
                 
         return deaths
     
@@ -246,6 +346,13 @@ class EvolutionaryScenario:
         """Add ongoing selection pressure"""
         self.selection_pressures.append(pressure)
         
+    def population_fitness(self, population_traits: List[Dict[str, float]]) -> np.ndarray:
+        """Combined fitness modifier of all selection pressures for each organism"""
+        fitness = np.ones(len(population_traits))
+        for pressure in self.selection_pressures:
+            fitness *= pressure.calculate_population_fitness(population_traits)
+        return fitness
+        
     def add_pathogen(self, pathogen: Pathogen, introduction_gen: int):
         """Introduce a pathogen"""
         self.pathogens.append(pathogen)
@@ -497,24 +604,19 @@ class DisasterSimulator:
         if 'instant_mortality' in effects:
             mortality_rate = effects['instant_mortality']
             
+            draws = _rng.random(len(population))
+            
             # Distance-based mortality if epicenter exists
             if disaster.epicenter and disaster.radius:
-                for individual in population:
-                    distance = np.sqrt(
-                        (individual.position[0] - disaster.epicenter[0])**2 +
-                        (individual.position[1] - disaster.epicenter[1])**2
-                    )
-                    
-                    # Mortality decreases with distance
-                    local_mortality = mortality_rate * max(0, 1 - distance / disaster.radius)
-                    
-                    if random.random() < local_mortality:
-                        results['deaths'].append(individual)
+                positions = np.array([individual.position for individual in population],
+                                     dtype=np.float64).reshape(-1, 2)
+                dead = _radial_deaths(positions, np.asarray(disaster.epicenter, dtype=np.float64),
+                                      float(disaster.radius), float(mortality_rate), draws)
             else:
                 # Global mortality
-                for individual in population:
-                    if random.random() < mortality_rate:
-                        results['deaths'].append(individual)
+                dead = draws < mortality_rate
+            
+            results['deaths'] = [population[i] for i in np.flatnonzero(dead).tolist()]
         
         # Environmental changes
         if 'temperature_change' in effects:
@@ -579,4 +681,12 @@ if __name__ == "__main__":
     
     print(f"\nMeteor impact results:")
     print(f"Deaths: {len(results['deaths'])} / {len(population)}")
-    print(f"Environmental changes: {results['environment_changes']}")
\ No newline at end of file
+    print(f"Environmental changes: {results['environment_changes']}")
+    
+    # Selection on the survivors
+    pandemic = ScenarioLibrary.create_pandemic_scenario()
+    dead = set(map(id, results['deaths']))
+    survivors = [{'immunity': organism.immunity} for organism in population
+                 if id(organism) not in dead]
+    fitness = pandemic.population_fitness(survivors)
+    print(f"Survivor fitness under {pandemic.name}: mean {fitness.mean():.2f}")
\ No newline at end of file
@@ -1,21 +1,85 @@
 """
 Horizontal Gene Transfer - Living code that exchanges genetic material
 """
-import random
 import ast
+import builtins
 import inspect
 import types
 import math
-from typing import Dict, List, Optional, Any, Callable, Set, Tuple
-from dataclasses import dataclass
+import functools
+from typing import Dict, List, Optional, Any, Callable, Set, FrozenSet, Tuple
+from collections import Counter
+from dataclasses import dataclass, field
 import hashlib
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+try:
+    from ._rng import rng as _rng
+except ImportError:
+    # Fallback for standalone execution
+    from _rng import rng as _rng
 
-@dataclass
+# Integration stability for naked environmental DNA (matches PlasmidVector default)
+_TRANSFORMATION_STABILITY = 0.9
+
+# Conjugation requires donor and recipient within 5 units (compared squared)
+_MAX_CONJUGATION_DISTANCE = 5.0
+_MAX_CONJUGATION_DISTANCE_SQ = _MAX_CONJUGATION_DISTANCE ** 2
+
+_MISSING = object()
+
+
+def _pick(seq: List[Any]) -> Any:
+    """One uniform draw from seq using the shared generator"""
+    return seq[int(_rng.integers(len(seq)))]
+
+
+def _pick_many(seq: List[Any], k: int) -> List[Any]:
+    """k draws from seq with replacement"""
+    return [seq[i] for i in _rng.integers(len(seq), size=k).tolist()]
+
+
+def _sample(seq: List[Any], k: int) -> List[Any]:
+    """k distinct elements of seq"""
+    return [seq[i] for i in _rng.choice(len(seq), size=k, replace=False).tolist()]
+
+# Statements a transferred method may not contain
+_FORBIDDEN_NODES = (ast.Import, ast.ImportFrom, ast.Global, ast.Nonlocal)
+
+# Names a transferred method may not reference, even though they are not builtins it can see
+_FORBIDDEN_NAMES = frozenset({'__import__', 'eval', 'exec', 'open', 'compile',
+                              'getattr', 'setattr', 'delattr', 'globals', 'locals', 'vars'})
+
+# The only builtins visible to a transferred method
+_SAFE_BUILTINS = {name: getattr(builtins, name) for name in (
+    'abs', 'all', 'any', 'bool', 'dict', 'divmod', 'enumerate', 'filter', 'float',
+    'int', 'isinstance', 'len', 'list', 'map', 'max', 'min', 'pow', 'range',
+    'reversed', 'round', 'set', 'sorted', 'str', 'sum', 'tuple', 'zip',
+    'ArithmeticError', 'Exception', 'KeyError', 'TypeError', 'ValueError',
+    'ZeroDivisionError'
+)}
+
+
+def _is_dunder(name: str) -> bool:
+    """True for __special__ names"""
+    return name.startswith('__') and name.endswith('__')
+
+
+def _forbidden_reason(node: ast.AST) -> Optional[str]:
+    """Why a node may not appear in a transferred method, or None if it may"""
+    if isinstance(node, _FORBIDDEN_NODES):
+        return type(node).__name__
+    if isinstance(node, ast.Name) and (node.id in _FORBIDDEN_NAMES or _is_dunder(node.id)):
+        return f"name {node.id!r}"
+    if isinstance(node, ast.Attribute) and _is_dunder(node.attr):
+        return f"attribute {node.attr!r}"
+    return None
+
+
+@dataclass(slots=True)
 class GeneticElement:
     """A transferable genetic element (code fragment)"""
     element_id: str
@@ -25,42 +89,71 @@ class GeneticElement:
     metadata: Dict[str, Any]
     transfer_count: int = 0
     fitness_impact: float = 0.0
+    _callable: Optional[Callable] = field(default=None, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         if not self.element_id:
             # Generate ID from code hash
-            self.element_id = hashlib.md5(self.code.encode()).hexdigest()[:8]
+            self.element_id = hashlib.blake2b(self.code.encode(), digest_size=4).hexdigest()
     
     def is_compatible(self, target_class: type) -> bool:
         """Check if this element can be integrated into target class"""
-        if self.element_type == 'method':
-            # Check method signature compatibility
-            try:
-                # Parse method to check parameters
-                tree = ast.parse(self.code)
-                if isinstance(tree.body[0], ast.FunctionDef):
-                    method_name = tree.body[0].name
-                    # Don't override critical methods
-                    if method_name in ['__init__', '__del__', '__new__']:
-                        return False
-                    return True
-            except:
-                return False
-                
-        elif self.element_type == 'attribute':
-            # Attributes are generally compatible
-            return True
+        return _check_compatibility(self.element_type, self.code, target_class)
+    
+    def get_callable(self) -> Callable:
+        """Validate and compile a method element once, returning its function"""
+        if self._callable is None:
+            tree = ast.parse(self.code)
+            if not tree.body or not isinstance(tree.body[0], ast.FunctionDef):
+                raise ValueError(f"Element {self.element_id} does not define a function")
+            for node in ast.walk(tree):
+                reason = _forbidden_reason(node)
+                if reason is not None:
+                    raise ValueError(f"Element {self.element_id} contains forbidden {reason}")
             
-        elif self.element_type == 'trait':
-            # Check if target has trait system
-            return hasattr(target_class, 'traits') or hasattr(target_class, 'base_traits')
+            # Execute with only the allow-listed builtins in scope
+            namespace: Dict[str, Any] = {'__builtins__': _SAFE_BUILTINS}
+            exec(compile(tree, f"<genetic_element {self.element_id}>", 'exec'), namespace)
+            func = namespace[tree.body[0].name]
+            func.__hgt_source__ = self.code
+            self._callable = func
+        return self._callable
+
+
+@functools.lru_cache(maxsize=4096)
+def _check_compatibility(element_type: str, code: str, target_class: type) -> bool:
+    """Cached compatibility check keyed on element content and host class"""
+    if element_type == 'method':
+        # Check method signature compatibility
+        try:
+            # Parse method to check parameters
+            tree = ast.parse(code)
+            if isinstance(tree.body[0], ast.FunctionDef):
+                method_name = tree.body[0].name
+                # Don't override critical methods
+                if method_name in ['__init__', '__del__', '__new__']:
+                    return False
+                return True
+        except:
+            return False
             
+    elif element_type == 'attribute':
+        # Attributes are generally compatible
         return True
+        
+    elif element_type == 'trait':
+        # Check if target has trait system
+        return hasattr(target_class, 'traits') or hasattr(target_class, 'base_traits')
+        
+    return True
 
 
 class PlasmidVector:
     """Carrier for horizontal gene transfer (like bacterial plasmids)"""
     
+    __slots__ = ('vector_id', 'capacity', 'genetic_elements', 'host_history',
+                 'resistance_markers', 'transfer_rate', 'stability')
+    
     def __init__(self, vector_id: str, capacity: int = 5):
         self.vector_id = vector_id
         self.capacity = capacity
@@ -93,32 +186,36 @@ class PlasmidVector:
                 if marker in host.resistances:
                     return False
                     
-        return random.random() < self.transfer_rate
+        return _rng.random() < self.transfer_rate
     
     def integrate_into_host(self, host: Any) -> List[str]:
         """Integrate genetic elements into host"""
-        integrated = []
-        
-        for element in self.genetic_elements:
-            if random.random() < self.stability:
-                success = self._integrate_element(host, element)
-                if success:
-                    integrated.append(element.element_id)
-                    element.transfer_count += 1
+        if not self.genetic_elements:
+            return []
+            
+        integrated = [
+            element.element_id
+            for element in self.genetic_elements
+            if _integrate_element_direct(host, element, self.stability)
+        ]
         
         if integrated:
             self.host_history.append(getattr(host, 'id', str(host)))
             
         return integrated
     
-    def _integrate_element(self, host: Any, element: GeneticElement) -> bool:
+    @staticmethod
+    def _integrate_element(host: Any, element: GeneticElement) -> bool:
         """Actually integrate genetic element into host"""
         try:
             if element.element_type == 'method':
                 # Dynamic method addition
-                exec(element.code)
-                method_name = element.code.split('def ')[1].split('(')[0]
-                method = locals()[method_name]
+                method = element.get_callable()
+                method_name = method.__name__
+                existing = getattr(host.__class__, method_name, None)
+                if getattr(existing, '__hgt_source__', None) == element.code:
+                    # Identical method already integrated by an earlier transfer
+                    return True
                 setattr(host.__class__, method_name, method)
                 logger.info(f"Integrated method {method_name} into {host.__class__.__name__}")
                 return True
@@ -148,9 +245,21 @@ class PlasmidVector:
         return False
 
 
+def _integrate_element_direct(host: Any, element: GeneticElement,
+                              stability: float) -> bool:
+    """Integrate a single element without wrapping it in a plasmid"""
+    if _rng.random() < stability and PlasmidVector._integrate_element(host, element):
+        element.transfer_count += 1
+        return True
+    return False
+
+
 class TransposableElement:
     """Jumping genes that can move within and between genomes"""
     
+    __slots__ = ('element_id', 'sequence', 'element_class', 'copy_number',
+                 'activity_level', 'target_sites')
+    
     def __init__(self, element_id: str, sequence: str, element_class: str = "DNA"):
         self.element_id = element_id
         self.sequence = sequence  # The actual code/function
@@ -162,16 +271,16 @@ class TransposableElement:
     def transpose(self, source_genome: Dict, target_genome: Dict, 
                  cut_and_paste: bool = False) -> bool:
         """Move or copy element between genomes"""
-        if random.random() > self.activity_level:
+        if _rng.random() > self.activity_level:
             return False
             
         try:
             # Find insertion site
             if self.target_sites:
-                site = random.choice(self.target_sites)
+                site = _pick(self.target_sites)
             else:
                 # Random insertion
-                site = random.choice(list(target_genome.keys()))
+                site = _pick(list(target_genome))
             
             # Insert element
             if site not in target_genome:
@@ -201,9 +310,15 @@ class TransposableElement:
 class ViralVector:
     """Virus-like agent for gene transfer"""
     
+    __slots__ = ('virus_id', 'host_range', '_host_range_set', '_universal',
+                 'genome', 'infection_rate', 'integration_rate', 'lytic',
+                 'latent', 'burst_size')
+    
     def __init__(self, virus_id: str, host_range: List[str]):
         self.virus_id = virus_id
         self.host_range = host_range  # Species that can be infected
+        self._host_range_set: FrozenSet[str] = frozenset(host_range)
+        self._universal: bool = 'universal' in self._host_range_set
         self.genome: Dict[str, GeneticElement] = {}
         self.infection_rate = 0.3
         self.integration_rate = 0.1  # Rate of genome integration
@@ -214,22 +329,22 @@ class ViralVector:
     def infect(self, host: Any) -> bool:
         """Attempt to infect host"""
         # Check host range
-        host_species = getattr(host, 'species', getattr(host, '__class__.__name__', 'unknown'))
+        host_species = getattr(host, 'species', None) or host.__class__.__name__
         
-        if host_species not in self.host_range and 'universal' not in self.host_range:
+        if not self._universal and host_species not in self._host_range_set:
             return False
             
-        if random.random() > self.infection_rate:
+        if _rng.random() > self.infection_rate:
             return False
             
         # Successful infection
-        if hasattr(host, 'viral_infections'):
+        try:
             host.viral_infections.append(self.virus_id)
-        else:
+        except AttributeError:
             host.viral_infections = [self.virus_id]
             
         # Integrate genes
-        if random.random() < self.integration_rate:
+        if _rng.random() < self.integration_rate:
             self._integrate_viral_genes(host)
             
         return True
@@ -258,26 +373,25 @@ class ViralVector:
         if self.virus_id not in getattr(host, 'viral_infections', []):
             return []
             
-        progeny = []
+        progeny: List[Optional['ViralVector']] = [None] * self.burst_size
         
-        for _ in range(self.burst_size):
-            # Create progeny with possible mutations
+        for i in range(self.burst_size):
+            # Create progeny with possible mutations; host_range is never
+            # mutated here so progeny share it instead of copying
             new_virus = ViralVector(
-                f"{self.virus_id}_prog_{random.randint(1000, 9999)}",
-                self.host_range.copy()
+                f"{self.virus_id}_prog_{_rng.integers(1000, 10000)}",
+                self.host_range
             )
             
-            # Copy genome with mutations
-            for gene_id, element in self.genome.items():
-                if random.random() < 0.95:  # 5% mutation rate
-                    new_virus.genome[gene_id] = element
-                else:
-                    # Mutate
-                    mutated = self._mutate_element(element)
-                    new_virus.genome[gene_id] = mutated
+            # Copy genome with mutations (5% mutation rate)
+            draws = _rng.random(len(self.genome)).tolist()
+            new_virus.genome = {
+                gene_id: element if draw < 0.95 else self._mutate_element(element)
+                for (gene_id, element), draw in zip(self.genome.items(), draws)
+            }
                     
-            new_virus.infection_rate = self.infection_rate * random.uniform(0.9, 1.1)
-            progeny.append(new_virus)
+            new_virus.infection_rate = self.infection_rate * _rng.uniform(0.9, 1.1)
+            progeny[i] = new_virus
             
         # Kill host if lytic
         if self.lytic and hasattr(host, 'alive'):
@@ -295,7 +409,7 @@ class ViralVector:
                 traits = json.loads(element.code)
                 for trait in traits:
                     if isinstance(traits[trait], (int, float)):
-                        traits[trait] *= random.uniform(0.8, 1.2)
+                        traits[trait] *= _rng.uniform(0.8, 1.2)
                 mutated_code = json.dumps(traits)
             except:
                 pass
@@ -309,6 +423,44 @@ class ViralVector:
         )
 
 
+class UniformGrid:
+    """Uniform grid over organism positions for neighbour queries
+    
+    With cell size equal to the query radius, every neighbour of an
+    organism lies in its own cell or one of the eight around it.
+    """
+    
+    __slots__ = ('cell_size', 'organisms', 'positions', 'cells')
+    
+    def __init__(self, organisms: List[Any], cell_size: float = _MAX_CONJUGATION_DISTANCE):
+        self.cell_size = cell_size
+        self.organisms = [org for org in organisms
+                          if getattr(org, 'position', None) is not None]
+        self.positions = [org.position for org in self.organisms]
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        for index, (x, y) in enumerate(self.positions):
+            key = (math.floor(x / cell_size), math.floor(y / cell_size))
+            bucket = self.cells.get(key)
+            if bucket is None:
+                self.cells[key] = [index]
+            else:
+                bucket.append(index)
+    
+    def neighbors(self, index: int) -> List[int]:
+        """Indices of organisms within cell_size of organism index (excluding itself)"""
+        x, y = self.positions[index]
+        cx, cy = math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+        radius_sq = self.cell_size * self.cell_size
+        found = []
+        for key in ((cx + i, cy + j) for i in (-1, 0, 1) for j in (-1, 0, 1)):
+            for other in self.cells.get(key, ()):
+                if other != index:
+                    ox, oy = self.positions[other]
+                    if (ox - x) ** 2 + (oy - y) ** 2 <= radius_sq:
+                        found.append(other)
+        return found
+
+
 class HGTNetwork:
     """Network for horizontal gene transfer between organisms"""
     
@@ -323,6 +475,15 @@ class HGTNetwork:
         """Add gene to the pool"""
         self.gene_pool[element.element_id] = element
         
+    @staticmethod
+    def _sample_env_dna(population: List[Any]) -> List[GeneticElement]:
+        """Environmental DNA pool for one step, from the current genomes"""
+        env_dna = []
+        for org in _sample(population, min(5, len(population))):
+            if hasattr(org, 'genome'):
+                env_dna.extend(list(org.genome.values())[:2])
+        return env_dna
+        
     def create_plasmid(self, source_organism: Any) -> PlasmidVector:
         """Create plasmid from organism's genes"""
         plasmid_id = f"plasmid_{len(self.plasmids)}"
@@ -386,7 +547,7 @@ class HGTNetwork:
             return False
             
         competence = organism.transformation_competence
-        if random.random() > competence:
+        if _rng.random() > competence:
             return False
             
         # Attempt to integrate environmental DNA
@@ -394,14 +555,10 @@ class HGTNetwork:
         
         for element in environmental_dna:
             if element.is_compatible(organism.__class__):
-                if random.random() < competence * 0.5:  # Lower rate than plasmid
-                    # Direct integration attempt
-                    plasmid = PlasmidVector(f"temp_{element.element_id}", capacity=1)
-                    plasmid.add_element(element)
-                    
-                    result = plasmid.integrate_into_host(organism)
-                    if result:
-                        integrated.extend(result)
+                if _rng.random() < competence * 0.5:  # Lower rate than plasmid
+                    # Direct integration attempt (no throwaway plasmid)
+                    if _integrate_element_direct(organism, element, _TRANSFORMATION_STABILITY):
+                        integrated.append(element.element_id)
                         
         if integrated:
             self.transfer_history.append({
@@ -421,10 +578,7 @@ class HGTNetwork:
             # Sample some genes
             donor_genes = list(donor.genome.values())
             if donor_genes:
-                picked_genes = random.sample(
-                    donor_genes, 
-                    min(3, len(donor_genes))
-                )
+                picked_genes = _sample(donor_genes, min(3, len(donor_genes)))
                 
                 for gene in picked_genes:
                     if isinstance(gene, GeneticElement):
@@ -448,23 +602,21 @@ class HGTNetwork:
     
     def _can_conjugate(self, donor: Any, recipient: Any) -> bool:
         """Check if conjugation is possible"""
-        # Check physical proximity
-        if hasattr(donor, 'position') and hasattr(recipient, 'position'):
-            distance = math.sqrt(
-                (donor.position[0] - recipient.position[0])**2 +
-                (donor.position[1] - recipient.position[1])**2
-            )
-            if distance > 5:  # Too far
+        # Check physical proximity (squared distance, no sqrt)
+        donor_pos = getattr(donor, 'position', _MISSING)
+        recipient_pos = getattr(recipient, 'position', _MISSING)
+        if donor_pos is not _MISSING and recipient_pos is not _MISSING:
+            dx = donor_pos[0] - recipient_pos[0]
+            dy = donor_pos[1] - recipient_pos[1]
+            if dx * dx + dy * dy > _MAX_CONJUGATION_DISTANCE_SQ:  # Too far
                 return False
                 
-        # Check species compatibility
-        if hasattr(donor, 'species') and hasattr(recipient, 'species'):
-            # More likely between same species
-            if donor.species == recipient.species:
-                return random.random() < 0.8
-            else:
-                # Cross-species is rarer
-                return random.random() < 0.2
+        # Check species compatibility: more likely between same species,
+        # cross-species is rarer
+        donor_species = getattr(donor, 'species', _MISSING)
+        recipient_species = getattr(recipient, 'species', _MISSING)
+        if donor_species is not _MISSING and recipient_species is not _MISSING:
+            return _rng.random() < (0.8 if donor_species == recipient_species else 0.2)
                 
         return True
     
@@ -479,66 +631,81 @@ class HGTNetwork:
         if len(population) < 2:
             return events
             
-        # Conjugation events
-        for _ in range(min(10, len(population) // 2)):
-            donor = random.choice(population)
-            recipient = random.choice(population)
-            
+        # Conjugation events (partners drawn in one batch)
+        n_conj = min(10, len(population) // 2)
+        donors = _pick_many(population, n_conj)
+        recipients = _pick_many(population, n_conj)
+        for donor, recipient in zip(donors, recipients):
             if donor != recipient:
                 if self.conjugation(donor, recipient):
                     events['conjugation'] += 1
         
-        # Transformation events
-        # Create environmental DNA pool
-        env_dna = []
-        for org in random.sample(population, min(5, len(population))):
-            if hasattr(org, 'genome'):
-                env_dna.extend(list(org.genome.values())[:2])
+        # Transformation events; the pool is resampled every step so it
+        # reflects genomes changed by earlier transfers
+        env_dna = self._sample_env_dna(population)
         
         if env_dna:
-            for _ in range(min(5, len(population) // 4)):
-                recipient = random.choice(population)
-                if self.transformation(recipient, random.sample(env_dna, min(3, len(env_dna)))):
+            n_trans = min(5, len(population) // 4)
+            for recipient in _pick_many(population, n_trans):
+                if self.transformation(recipient, _sample(env_dna, min(3, len(env_dna)))):
                     events['transformation'] += 1
         
         # Transduction events
         if self.viruses:
-            for _ in range(min(3, len(population) // 10)):
-                virus = random.choice(list(self.viruses.values()))
-                donor = random.choice(population)
-                recipient = random.choice(population)
-                
+            n_transd = min(3, len(population) // 10)
+            viruses = _pick_many(list(self.viruses.values()), n_transd)
+            donors = _pick_many(population, n_transd)
+            recipients = _pick_many(population, n_transd)
+            for virus, donor, recipient in zip(viruses, donors, recipients):
                 if donor != recipient:
                     if self.transduction(virus, donor, recipient):
                         events['transduction'] += 1
         
         return events
     
+    def conjugation_step(self, population: List[Any]) -> int:
+        """Let every conjugation-capable organism attempt one transfer to a
+        random partner in range; returns the number of successful transfers
+        
+        Partners come from a UniformGrid rebuilt once per call, so the
+        sweep costs O(N * k) for k neighbours instead of O(N^2).
+        """
+        grid = UniformGrid(population)
+        transfers = 0
+        for index, donor in enumerate(grid.organisms):
+            if not getattr(donor, 'conjugation_ability', True):
+                continue
+            partners = grid.neighbors(index)
+            if partners and self.conjugation(donor, grid.organisms[_pick(partners)]):
+                transfers += 1
+        return transfers
+    
     def analyze_gene_flow(self) -> Dict[str, Any]:
         """Analyze patterns in gene transfer"""
         analysis = {
             'total_transfers': len(self.transfer_history),
-            'transfer_types': {},
-            'most_transferred_genes': {},
+            # Count by type
+            'transfer_types': Counter(t['type'] for t in self.transfer_history),
+            # Track gene popularity
+            'most_transferred_genes': Counter(
+                gene_id
+                for t in self.transfer_history
+                for gene_id in t.get('genes', ())
+            ),
             'species_connectivity': {}
         }
         
-        # Count by type
-        for transfer in self.transfer_history:
-            t_type = transfer['type']
-            analysis['transfer_types'][t_type] = analysis['transfer_types'].get(t_type, 0) + 1
-            
-            # Track gene popularity
-            for gene_id in transfer.get('genes', []):
-                analysis['most_transferred_genes'][gene_id] = \
-                    analysis['most_transferred_genes'].get(gene_id, 0) + 1
-        
         return analysis
 
 
 class LivingCodeOrganism:
     """Organism capable of horizontal gene transfer"""
     
+    # '__dict__' stays so attribute-type genes can still add new attributes
+    __slots__ = ('id', 'species', 'genome', 'plasmids', 'viral_infections',
+                 'position', 'transformation_competence', 'conjugation_ability',
+                 'acquired_traits', '__dict__')
+    
     def __init__(self, organism_id: str, species: str):
         self.id = organism_id
         self.species = species
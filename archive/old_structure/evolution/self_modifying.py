@@ -3,26 +3,211 @@ Self-Modifying Code - Code that can modify and evolve itself
 """
 import os
 import sys
+import string
 import ast
 import inspect
 import importlib.util
+import marshal
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Dict, Any
+from types import CodeType, ModuleType
+from typing import Optional, Dict, Any, List, Tuple, Union
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Source for an evolved entity; $-placeholders leave the generated code's
+# own braces alone and are filled in by absorb_and_evolve
+_EVOLVED_TEMPLATE = string.Template('''"""
+Evolved from $base_path
+Generation: $generation
+Absorbed classes: $absorbed
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+# === ABSORBED BASE CODE ===
+$base_code
+
+# === EVOLVED CODE ===
+class Evolved$name($bases):
+    """Evolved entity that absorbed base traits"""
+    
+    generation = $generation
+    absorbed_from = "$base_path"
+    
+    def __init__(self):
+        # Absorbed classes may not cooperate with super(), so initialize
+        # each direct base explicitly in one loop
+        for base in Evolved$name.__bases__:
+            base.__init__(self)
+        self.evolved_traits = []
+        self.mutations = $mutations
+        logger.info("Evolved%s initialized", self.__class__.__name__)
+    
+    def demonstrate_absorption(self):
+        """Show that we absorbed parent traits"""
+        # Call parent methods if they exist
+        results = []
+${trait_block}        return results
+    
+    def evolve_further(self):
+        """Continue evolution"""
+        self.mutations.append(f"evolution_at_gen_{self.generation}")
+        return f"Evolved to generation {self.generation}"
+
+# Self-destruct the base if specified
+if __name__ == "__main__":
+    entity = Evolved$name()
+    print(f"Created: {entity.__class__.__name__}")
+    print(f"Generation: {entity.generation}")
+    print(f"Absorbed from: {entity.absorbed_from}")
+    
+    # Demonstrate absorbed traits
+    traits = entity.demonstrate_absorption()
+    if traits:
+        print(f"Absorbed traits: {traits}")
+''')
+
+# Emitted once into demonstrate_absorption when any base was absorbed
+_TRAIT_BLOCK = '''        if hasattr(self, 'essential_trait'):
+            results.append(self.essential_trait())
+'''
+
+# Output directories (relative to the working directory)
+_EVOLVED_DIR = Path("evolved_entities")
+_LEGACY_DIR = Path("legacy")
+_EXAMPLES_DIR = Path("evolution_examples")
+_VERSIONS_DIR = Path("code_versions")
+
+# Request an already-optimized AST where the interpreter supports it (3.13+)
+_AST_FLAGS = ast.PyCF_ONLY_AST | getattr(ast, 'PyCF_OPTIMIZED_AST', 0)
+
+
+class _FileCache:
+    """Latest value per file path, dropped once the file's mtime changes.
+    
+    Holds at most maxsize paths, evicting the least recently used.
+    """
+    __slots__ = ('_entries', 'maxsize')
+    
+    def __init__(self, maxsize: int = 64):
+        self._entries: 'OrderedDict[str, Tuple[int, Any]]' = OrderedDict()
+        self.maxsize = maxsize
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, path: str, mtime_ns: int) -> Any:
+        """Value stored for this version of path, or None"""
+        entry = self._entries.get(path)
+        if entry is None:
+            return None
+        if entry[0] != mtime_ns:
+            del self._entries[path]
+            return None
+        self._entries.move_to_end(path)
+        return entry[1]
+    
+    def pop(self, path: str, mtime_ns: int) -> Any:
+        """Remove and return the value stored for this version of path, or None"""
+        value = self.get(path, mtime_ns)
+        if value is not None:
+            del self._entries[path]
+        return value
+    
+    def put(self, path: str, mtime_ns: int, value: Any):
+        """Store value for this version of path, replacing any older version"""
+        self._entries[path] = (mtime_ns, value)
+        self._entries.move_to_end(path)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+# Loaded evolved modules per resolved path
+_MODULE_CACHE = _FileCache()
+
+# Compiled code of freshly generated files, so loading them skips a disk
+# read and a second parse
+_CODE_CACHE = _FileCache()
+
+# Top-level class names per base file
+_BASES_CACHE = _FileCache()
+
+
+def _top_level_classes(path: str, raw: bytes) -> List[str]:
+    """Names of top-level classes in a file, cached until it changes"""
+    mtime_ns = os.stat(path).st_mtime_ns
+    names = _BASES_CACHE.get(path, mtime_ns)
+    if names is None:
+        # Parsing also rejects a base file with invalid syntax
+        tree = compile(raw, path, 'exec', flags=_AST_FLAGS)
+        names = [node.name for node in tree.body if isinstance(node, ast.ClassDef)]
+        _BASES_CACHE.put(path, mtime_ns, names)
+    return list(names)
+
+
+def _ensure_dir(path: Path):
+    """Create an output directory if it does not exist yet"""
+    path.mkdir(parents=True, exist_ok=True)
+
+
+def _atomic_write(path: Path, data: Union[str, bytes]):
+    """Write data in one call to a temp file, then atomically rename it"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
 
+def _write_pyc(source_path: Path, code: CodeType):
+    """Write a timestamp-based .pyc for source_path so later imports skip parsing"""
+    if sys.dont_write_bytecode:
+        return
+    st = os.stat(source_path)
+    header = (
+        importlib.util.MAGIC_NUMBER
+        + (0).to_bytes(4, 'little')  # flags: timestamp-based pyc (PEP 552)
+        + (int(st.st_mtime) & 0xFFFFFFFF).to_bytes(4, 'little')
+        + (st.st_size & 0xFFFFFFFF).to_bytes(4, 'little')
+    )
+    cache_path = Path(importlib.util.cache_from_source(str(source_path)))
+    cache_path.parent.mkdir(exist_ok=True)
+    _atomic_write(cache_path, header + marshal.dumps(code))
+
+
+def _capture_source(cls: type) -> type:
+    """Store a class's source on it once, at definition time"""
+    try:
+        cls.__source__ = inspect.getsource(cls)
+    except (OSError, TypeError):
+        # Defined somewhere without retrievable source (e.g. exec'd code)
+        cls.__source__ = None
+    return cls
+
+
+@_capture_source
 class SelfModifyingCode:
     """Base class that can be absorbed by derived classes"""
     
+    __source__: Optional[str] = None
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _capture_source(cls)
+    
     def __init__(self):
         self.absorbed_traits = []
         self.generation = 0
     
     def get_source(self) -> str:
         """Get own source code"""
-        return inspect.getsource(self.__class__)
+        source = self.__class__.__source__
+        if source is None:
+            raise OSError(f"source code not available for {self.__class__.__name__}")
+        return source
     
     def essential_trait(self):
         """Essential trait to be inherited"""
@@ -41,96 +226,49 @@ class EvolvingCode:
     def absorb_and_evolve(self, base_class_path: str, delete_original: bool = True) -> Optional[Path]:
         """Absorb base class code and create evolved version"""
         try:
-            # Read base class file
-            with open(base_class_path, 'r') as f:
-                base_code = f.read()
-            
-            # Parse base code to extract class definitions
-            tree = ast.parse(base_code)
-            base_classes = []
-            
-            for node in ast.walk(tree):
-                if isinstance(node, ast.ClassDef):
-                    base_classes.append(node.name)
-            
-            # Create evolved code
-            evolved_code = f'''"""
-Evolved from {base_class_path}
-Generation: {self.generation + 1}
-Absorbed classes: {', '.join(base_classes)}
-"""
-import logging
-
-logger = logging.getLogger(__name__)
-
-# === ABSORBED BASE CODE ===
-{base_code}
-
-# === EVOLVED CODE ===
-class Evolved{self.name}({', '.join(base_classes) if base_classes else 'object'}):
-    """Evolved entity that absorbed base traits"""
-    
-    generation = {self.generation + 1}
-    absorbed_from = "{base_class_path}"
-    
-    def __init__(self):
-'''
-            
-            # Add parent class initialization
-            for base in base_classes:
-                evolved_code += f"        {base}.__init__(self)\n"
-            
-            evolved_code += f'''        self.evolved_traits = []
-        self.mutations = {self.mutations}
-        logger.info(f"Evolved{{self.__class__.__name__}} initialized")
-    
-    def demonstrate_absorption(self):
-        """Show that we absorbed parent traits"""
-        # Call parent methods if they exist
-        results = []
-'''
+            # Read base class file once and parse the raw bytes directly
+            raw = Path(base_class_path).read_bytes()
+            base_classes = _top_level_classes(base_class_path, raw)
+            base_code = raw.decode('utf-8')
+            del raw
             
-            # Try to call parent methods
-            for base in base_classes:
-                evolved_code += f'''        if hasattr(self, 'essential_trait'):
-            results.append(self.essential_trait())
-'''
+            # Precompute the pieces substituted into the template
+            absorbed = ', '.join(base_classes)
+            bases = absorbed or 'object'
             
-            evolved_code += '''        return results
-    
-    def evolve_further(self):
-        """Continue evolution"""
-        self.mutations.append(f"evolution_at_gen_{self.generation}")
-        return f"Evolved to generation {self.generation}"
-
-# Self-destruct the base if specified
-if __name__ == "__main__":
-    entity = Evolved{name}()
-    print(f"Created: {{entity.__class__.__name__}}")
-    print(f"Generation: {{entity.generation}}")
-    print(f"Absorbed from: {{entity.absorbed_from}}")
-    
-    # Demonstrate absorbed traits
-    traits = entity.demonstrate_absorption()
-    if traits:
-        print(f"Absorbed traits: {{traits}}")
-'''.format(name=self.name)
+            # Only the placeholders change between evolutions
+            evolved_code = _EVOLVED_TEMPLATE.substitute(
+                base_path=base_class_path,
+                generation=self.generation + 1,
+                absorbed=absorbed,
+                base_code=base_code,
+                name=self.name,
+                bases=bases,
+                mutations=self.mutations,
+                trait_block=_TRAIT_BLOCK if base_classes else '',
+            )
             
             # Save evolved code
-            evolved_dir = Path("evolved_entities")
-            evolved_dir.mkdir(exist_ok=True)
-            
-            evolved_path = evolved_dir / f"evolved_{self.name}_gen{self.generation + 1}.py"
+            _ensure_dir(_EVOLVED_DIR)
+            evolved_path = _EVOLVED_DIR / f"evolved_{self.name}_gen{self.generation + 1}.py"
             
-            with open(evolved_path, 'w') as f:
-                f.write(evolved_code)
+            # Compile before writing so invalid code never reaches the disk
+            resolved = str(evolved_path.resolve())
+            code = compile(evolved_code, resolved, 'exec')
+            _atomic_write(evolved_path, evolved_code)
+            _write_pyc(evolved_path, code)
+            _CODE_CACHE.put(resolved, os.stat(resolved).st_mtime_ns, code)
             
-            logger.info(f"Created evolved entity at {evolved_path}")
+            logger.info("Created evolved entity at %s", evolved_path)
             
             # Delete original if requested
-            if delete_original and os.path.exists(base_class_path):
-                os.remove(base_class_path)
-                logger.info(f"Deleted original base class: {base_class_path}")
+            if delete_original:
+                try:
+                    os.remove(base_class_path)
+                except FileNotFoundError:
+                    pass
+                else:
+                    logger.info("Deleted original base class: %s", base_class_path)
             
             # Update self
             self.absorbed_classes.extend(base_classes)
@@ -139,7 +277,7 @@ if __name__ == "__main__":
             return evolved_path
             
         except Exception as e:
-            logger.error(f"Evolution failed: {e}")
+            logger.error("Evolution failed: %s", e)
             return None
 
 
@@ -173,34 +311,54 @@ class SelfDeletingCode:
     
     def _leave_legacy(self):
         """Leave trace before deletion"""
-        legacy_dir = Path("legacy")
-        legacy_dir.mkdir(exist_ok=True)
-        
-        legacy_file = legacy_dir / f"{self.name}_legacy.txt"
+        _ensure_dir(_LEGACY_DIR)
+        legacy_file = _LEGACY_DIR / f"{self.name}_legacy.txt"
         
-        with open(legacy_file, 'w') as f:
-            f.write(f"{self.name} existed\n")
-            f.write(f"Executed {self.execution_count} times\n")
-            f.write(f"Final message: Remember me\n")
+        _atomic_write(
+            legacy_file,
+            f"{self.name} existed\n"
+            f"Executed {self.execution_count} times\n"
+            "Final message: Remember me\n"
+        )
     
     def _self_destruct(self):
         """Delete own file"""
-        if hasattr(self, '__file__'):
-            try:
-                os.remove(self.__file__)
-                logger.info(f"{self.name} self-destructed")
-            except Exception as e:
-                logger.error(f"Self-destruct failed: {e}")
+        try:
+            os.remove(self.__file__)
+            logger.info("%s self-destructed", self.name)
+        except AttributeError:
+            # Nothing on disk to remove
+            pass
+        except Exception as e:
+            logger.error("Self-destruct failed: %s", e)
+
+
+def _load_evolved_module(path: Path) -> ModuleType:
+    """Import a generated module, reusing it while the file is unchanged"""
+    resolved = str(Path(path).resolve())
+    mtime_ns = os.stat(resolved).st_mtime_ns
+    module = _MODULE_CACHE.get(resolved, mtime_ns)
+    if module is None:
+        code = _CODE_CACHE.pop(resolved, mtime_ns)
+        if code is None:
+            spec = importlib.util.spec_from_file_location("evolved", resolved)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        else:
+            # We just generated and compiled this file; run that code
+            module = ModuleType("evolved")
+            module.__file__ = resolved
+            exec(code, module.__dict__)
+        _MODULE_CACHE.put(resolved, mtime_ns, module)
+    return module
 
 
 def create_self_modifying_example():
     """Create example of self-modifying code"""
     
     # Create base class file
-    base_dir = Path("evolution_examples")
-    base_dir.mkdir(exist_ok=True)
-    
-    base_file = base_dir / "base_life.py"
+    _ensure_dir(_EXAMPLES_DIR)
+    base_file = _EXAMPLES_DIR / "base_life.py"
     
     base_code = '''"""Base digital life form"""
 
@@ -234,7 +392,7 @@ class LifeSupport:
     with open(base_file, 'w') as f:
         f.write(base_code)
     
-    logger.info(f"Created base class at {base_file}")
+    logger.info("Created base class at %s", base_file)
     
     # Create evolver
     evolver = EvolvingCode("DigitalOrganism")
@@ -243,12 +401,10 @@ class LifeSupport:
     evolved_path = evolver.absorb_and_evolve(str(base_file), delete_original=True)
     
     if evolved_path:
-        logger.info(f"Evolution complete! New entity at: {evolved_path}")
+        logger.info("Evolution complete! New entity at: %s", evolved_path)
         
         # Load and test evolved entity
-        spec = importlib.util.spec_from_file_location("evolved", evolved_path)
-        evolved_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(evolved_module)
+        evolved_module = _load_evolved_module(evolved_path)
         
         # Get evolved class
         evolved_class = getattr(evolved_module, f"Evolved{evolver.name}")
@@ -311,15 +467,12 @@ if __name__ == "__main__":
 '''
         
         # Save new version
-        version_dir = Path("code_versions")
-        version_dir.mkdir(exist_ok=True)
-        
-        new_file = version_dir / f"self_writing_v{self.version + 0.1}.py"
+        _ensure_dir(_VERSIONS_DIR)
+        new_file = _VERSIONS_DIR / f"self_writing_v{self.version + 0.1}.py"
         
-        with open(new_file, 'w') as f:
-            f.write(new_code)
+        _atomic_write(new_file, new_code)
         
-        logger.info(f"Wrote next version to {new_file}")
+        logger.info("Wrote next version to %s", new_file)
         return new_file
 
 
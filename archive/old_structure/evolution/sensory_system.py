@@ -3,10 +3,36 @@ Sensory Perception System for Digital Cells
 """
 import numpy as np
 from typing import Dict, List, Tuple, Optional, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 import math
-from collections import defaultdict, deque
+from collections import Counter, deque
+
+try:
+    from ._numba_kernels import gradient_stencil as _gradient_stencil, thermo_batch as _thermo_batch
+except ImportError:
+    # Fallback for standalone execution
+    from _numba_kernels import gradient_stencil as _gradient_stencil, thermo_batch as _thermo_batch
+try:
+    from ._rng import rng as _rng
+except ImportError:
+    # Fallback for standalone execution
+    from _rng import rng as _rng
+
+
+def stack_chemical_gradients(chemical_map: Dict[str, Any]) -> Tuple[List[str], Optional[np.ndarray]]:
+    """Pack same-shape 2D chemical arrays into a (C, H, W) stack.
+    
+    Environments can store the result as 'chemical_names' / 'chemical_stack'
+    so chemoreceptors sample every channel in one indexing operation.
+    """
+    names = [name for name, grad in chemical_map.items()
+             if isinstance(grad, np.ndarray) and grad.ndim == 2]
+    if not names:
+        return [], None
+    shape = chemical_map[names[0]].shape
+    names = [name for name in names if chemical_map[name].shape == shape]
+    return names, np.stack([chemical_map[name] for name in names])
 
 
 class SensoryType(Enum):
@@ -19,9 +45,17 @@ class SensoryType(Enum):
     PROPRIOCEPTION = "position" # Self body awareness
     NOCICEPTION = "pain"       # Damage detection
     AUDITION = "hearing"       # Sound/vibration detection
+    
+    @property
+    def code(self) -> int:
+        """Small integer code used in the numeric signal arrays"""
+        return _SENSORY_CODES[self]
+
+
+_SENSORY_CODES = {sense: code for code, sense in enumerate(SensoryType)}
 
 
-@dataclass
+@dataclass(slots=True)
 class SensorySignal:
     """A sensory signal received by a cell"""
     signal_type: SensoryType
@@ -30,19 +64,70 @@ class SensorySignal:
     source_id: Optional[str] = None
     data: Optional[Dict[str, Any]] = None
     timestamp: float = 0.0
+    adapt_key: Tuple = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Habituation signature: type, source and the data field that
+        # identifies the stimulus (chemical, entity type or body state)
+        discriminator = None
+        if self.data:
+            discriminator = (self.data.get('chemical') or self.data.get('entity_type')
+                             or self.data.get('state'))
+        self.adapt_key = (self.signal_type, self.source_id, discriminator)
+
+
+class _PerceptionContext:
+    """Environment state parsed once per tick and shared by every organ"""
+    __slots__ = ('environment_state', 'cell_pos', 'cell_xy_int', 'light_level', 'cell_facing',
+                 'entities', '_entity_xy', 'chem_map', 'chem_stack', 'chem_names',
+                 'temperature', 'temp_map', 'collisions', 'vibrations', 'cell_state',
+                 'damage_events')
+    
+    def __init__(self, environment_state: Dict, cell_position: Tuple[float, float]):
+        get = environment_state.get
+        self.environment_state = environment_state
+        self.cell_pos = cell_position
+        self.cell_xy_int = (int(cell_position[0]), int(cell_position[1]))
+        self.light_level = get('light_level', 0.5)
+        self.cell_facing = get('cell_facing', 0)
+        self.entities = get('entities', [])
+        self._entity_xy = None
+        self.chem_map = get('chemical_gradients', {})
+        self.chem_stack = get('chemical_stack')
+        self.chem_names = get('chemical_names', ()) if self.chem_stack is not None else ()
+        self.temperature = get('temperature')
+        self.temp_map = get('temperature_map')
+        self.collisions = get('collisions', [])
+        self.vibrations = get('vibrations', [])
+        self.cell_state = get('cell_state', {})
+        self.damage_events = get('damage_events', [])
+        
+    @property
+    def entity_xy(self) -> np.ndarray:
+        """(N, 2) entity positions, read once per tick so moved entities are seen"""
+        if self._entity_xy is None:
+            self._entity_xy = np.array([entity.get('position', (0, 0)) for entity in self.entities],
+                                       dtype=np.float64).reshape(-1, 2)
+        return self._entity_xy
 
 
 class SensoryOrgan:
     """Base class for sensory organs"""
+    __slots__ = ('organ_type', 'sensitivity', 'energy_cost', 'damage', '_noise_scale')
     
     def __init__(self, organ_type: SensoryType, sensitivity: float = 0.5):
         self.organ_type = organ_type
         self.sensitivity = sensitivity  # 0-1, affects detection range/threshold
         self.energy_cost = 0.1  # Energy per sensing action
         self.damage = 0.0  # Organ can be damaged
+        self._noise_scale = 0.05 * (1 - sensitivity)  # Noise based on organ quality
         
     def perceive(self, environment_state: Dict, cell_position: Tuple[float, float]) -> List[SensorySignal]:
         """Process environmental stimuli into sensory signals"""
+        return self.perceive_context(_PerceptionContext(environment_state, cell_position))
+    
+    def perceive_context(self, ctx: _PerceptionContext) -> List[SensorySignal]:
+        """Process stimuli from an environment already parsed for this tick"""
         raise NotImplementedError
         
     def process_signal(self, raw_signal: float) -> float:
@@ -54,13 +139,65 @@ class SensoryOrgan:
         processed = raw_signal * self.sensitivity * (1 - self.damage)
         
         # Add noise based on organ quality
-        noise = np.random.normal(0, 0.05 * (1 - self.sensitivity))
+        noise = _rng.standard_normal() * self._noise_scale
         
         return max(0, min(1, processed + noise))
+    
+    def process_signal_batch(self, raw_signals: np.ndarray) -> np.ndarray:
+        """Vectorized process_signal over an array of raw signals"""
+        if self.damage > 0.8:
+            return np.zeros_like(raw_signals)  # Organ too damaged
+            
+        out = raw_signals * (self.sensitivity * (1 - self.damage))
+        out += _rng.standard_normal(out.shape) * self._noise_scale
+        
+        return np.clip(out, 0, 1, out=out)
+
+
+def _visual_data(entity: Dict, distance: float) -> Dict[str, Any]:
+    return {
+        'entity_type': entity.get('type', 'unknown'),
+        'size': entity.get('size', 1.0),
+        'distance': distance
+    }
+
+
+def _visual_data_color(entity: Dict, distance: float) -> Dict[str, Any]:
+    return {
+        'entity_type': entity.get('type', 'unknown'),
+        'size': entity.get('size', 1.0),
+        'distance': distance,
+        'color': entity.get('color', 'gray')
+    }
+
+
+def _visual_data_motion(entity: Dict, distance: float) -> Dict[str, Any]:
+    signal_data = _visual_data(entity, distance)
+    if 'velocity' in entity:
+        signal_data['movement'] = entity['velocity']
+    return signal_data
+
+
+def _visual_data_color_motion(entity: Dict, distance: float) -> Dict[str, Any]:
+    signal_data = _visual_data_color(entity, distance)
+    if 'velocity' in entity:
+        signal_data['movement'] = entity['velocity']
+    return signal_data
+
+
+# Signal data builder per (color_perception, motion_detection)
+_VISUAL_DATA_BUILDERS = {
+    (False, False): _visual_data,
+    (True, False): _visual_data_color,
+    (False, True): _visual_data_motion,
+    (True, True): _visual_data_color_motion,
+}
 
 
 class VisualSystem(SensoryOrgan):
     """Vision - detect light, colors, shapes, movement"""
+    __slots__ = ('field_of_view', 'color_perception', 'motion_detection', 'max_range', 'max_range_sq',
+                 'half_fov')
     
     def __init__(self, sensitivity: float = 0.5, field_of_view: float = 120):
         super().__init__(SensoryType.VISION, sensitivity)
@@ -68,56 +205,53 @@ class VisualSystem(SensoryOrgan):
         self.color_perception = sensitivity > 0.7  # Can see colors if sensitive enough
         self.motion_detection = True
         self.max_range = 20 + 30 * sensitivity  # Vision range
+        self.max_range_sq = self.max_range * self.max_range
+        self.half_fov = field_of_view * 0.5
         
-    def perceive(self, environment_state: Dict, cell_position: Tuple[float, float]) -> List[SensorySignal]:
+    def perceive_context(self, ctx: _PerceptionContext) -> List[SensorySignal]:
         signals = []
         
         # Detect light level
-        light_level = environment_state.get('light_level', 0.5)
+        light_level = ctx.light_level
         if light_level < 0.1:  # Too dark to see
             return signals
             
-        # Detect nearby entities
-        for entity in environment_state.get('entities', []):
-            if entity.get('id') == cell_position:  # Don't see self
-                continue
-                
-            # Calculate distance and direction
-            entity_pos = entity.get('position', (0, 0))
-            dx = entity_pos[0] - cell_position[0]
-            dy = entity_pos[1] - cell_position[1]
-            distance = math.sqrt(dx**2 + dy**2)
-            
-            if distance > self.max_range:
-                continue
-                
-            # Check if in field of view
-            angle = math.degrees(math.atan2(dy, dx))
-            cell_facing = environment_state.get('cell_facing', 0)
-            angle_diff = abs((angle - cell_facing + 180) % 360 - 180)
+        entities = ctx.entities
+        if not entities:
+            return signals
             
-            if angle_diff > self.field_of_view / 2:
-                continue
-                
-            # Create visual signal
-            intensity = self.process_signal((1 - distance / self.max_range) * light_level)
+        # Entity positions offset to the cell
+        cell_position = ctx.cell_pos
+        dxy = ctx.entity_xy - np.asarray(cell_position, dtype=np.float64)
+        dist_sq = np.einsum('ij,ij->i', dxy, dxy)
+        
+        # Range check on squared distance, then field of view on survivors
+        idx = np.flatnonzero(dist_sq <= self.max_range_sq)
+        if idx.size == 0:
+            return signals
             
-            signal_data = {
-                'entity_type': entity.get('type', 'unknown'),
-                'size': entity.get('size', 1.0),
-                'distance': distance
-            }
+        angles = np.degrees(np.arctan2(dxy[idx, 1], dxy[idx, 0]))
+        angle_diff = np.abs((angles - ctx.cell_facing + 180) % 360 - 180)
+        idx = idx[angle_diff <= self.half_fov]
+        if idx.size == 0:
+            return signals
             
-            if self.color_perception:
-                signal_data['color'] = entity.get('color', 'gray')
+        distances = np.sqrt(dist_sq[idx])
+        intensities = self.process_signal_batch((1 - distances / self.max_range) * light_level)
+        
+        # Materialize signals only for visible entities
+        build_data = _VISUAL_DATA_BUILDERS[bool(self.color_perception), bool(self.motion_detection)]
+        for i, distance, intensity in zip(idx.tolist(), distances.tolist(), intensities.tolist()):
+            entity = entities[i]
+            if entity.get('id') == cell_position:  # Don't see self
+                continue
                 
-            if self.motion_detection and 'velocity' in entity:
-                signal_data['movement'] = entity['velocity']
+            signal_data = build_data(entity, distance)
                 
             signals.append(SensorySignal(
                 signal_type=SensoryType.VISION,
                 intensity=intensity,
-                direction=(dx, dy),
+                direction=(float(dxy[i, 0]), float(dxy[i, 1])),
                 source_id=entity.get('id'),
                 data=signal_data
             ))
@@ -127,53 +261,95 @@ class VisualSystem(SensoryOrgan):
 
 class ChemoreceptorSystem(SensoryOrgan):
     """Smell/Taste - detect chemical gradients"""
+    __slots__ = ('chemical_types', 'detection_threshold')
     
     def __init__(self, sensitivity: float = 0.5):
         super().__init__(SensoryType.CHEMORECEPTION, sensitivity)
         self.chemical_types = ['food', 'toxin', 'pheromone', 'warning']
         self.detection_threshold = 0.1 * (1 - sensitivity)
         
-    def perceive(self, environment_state: Dict, cell_position: Tuple[float, float]) -> List[SensorySignal]:
+    def perceive_context(self, ctx: _PerceptionContext) -> List[SensorySignal]:
         signals = []
         
-        # Check chemical gradients
-        chemical_map = environment_state.get('chemical_gradients', {})
+        x, y = ctx.cell_xy_int
         
-        for chemical_type, gradient in chemical_map.items():
-            if chemical_type not in self.chemical_types:
+        # Stacked (C, H, W) gradients are sampled for all channels at once
+        stacked = ctx.chem_names
+        if ctx.chem_stack is not None:
+            signals.extend(self._perceive_stack(ctx.chem_stack, stacked, x, y))
+        
+        # Check chemical gradients
+        for chemical_type, gradient in ctx.chem_map.items():
+            if chemical_type not in self.chemical_types or chemical_type in stacked:
                 continue
                 
             # Sample chemical concentration at position
-            x, y = int(cell_position[0]), int(cell_position[1])
+            on_map = True
             if hasattr(gradient, 'shape') and 0 <= x < gradient.shape[0] and 0 <= y < gradient.shape[1]:
                 concentration = gradient[x, y]
+            elif isinstance(gradient, dict):
+                concentration = gradient.get((x, y), 0)
             else:
-                concentration = gradient.get((x, y), 0) if isinstance(gradient, dict) else 0
+                concentration, on_map = 0, False
                 
             if concentration < self.detection_threshold:
                 continue
                 
-            # Calculate gradient direction
-            dx, dy = self._calculate_gradient_direction(gradient, cell_position)
-            
-            intensity = self.process_signal(concentration)
+            # Calculate gradient direction; off the map there is nothing to follow
+            dx, dy = self._calculate_gradient_direction(gradient, ctx.cell_pos) if on_map else (0, 0)
             
-            signals.append(SensorySignal(
-                signal_type=SensoryType.CHEMORECEPTION,
-                intensity=intensity,
-                direction=(dx, dy) if (dx != 0 or dy != 0) else None,
-                data={
-                    'chemical': chemical_type,
-                    'concentration': concentration,
-                    'gradient_strength': math.sqrt(dx**2 + dy**2)
-                }
-            ))
+            signals.append(self._chemical_signal(chemical_type, concentration, dx, dy))
             
         return signals
     
+    def _perceive_stack(self, stack: np.ndarray, names, x: int, y: int) -> List[SensorySignal]:
+        """Sample every channel of a (C, H, W) gradient stack at (x, y)"""
+        _, h, w = stack.shape
+        if not (0 <= x < h and 0 <= y < w):
+            return []
+        
+        concentrations = stack[:, x, y]
+        known = np.fromiter((name in self.chemical_types for name in names), dtype=bool, count=len(names))
+        detected = np.flatnonzero(known & (concentrations >= self.detection_threshold))
+        if detected.size == 0:
+            return []
+        
+        # 8-neighbour stencil for all detected channels, clipped at the borders
+        x0, x1 = max(x - 1, 0), min(x + 2, h)
+        y0, y1 = max(y - 1, 0), min(y + 2, w)
+        diffs = stack[detected, x0:x1, y0:y1] - concentrations[detected, None, None]
+        dxs = np.einsum('cij,i->c', diffs, np.arange(x0 - x, x1 - x, dtype=np.float64))
+        dys = np.einsum('cij,j->c', diffs, np.arange(y0 - y, y1 - y, dtype=np.float64))
+        
+        intensities = self.process_signal_batch(concentrations[detected].astype(np.float64))
+        
+        return [self._chemical_signal(names[c], concentrations[c], dx, dy, intensity)
+                for c, dx, dy, intensity in zip(detected.tolist(), dxs.tolist(), dys.tolist(),
+                                                intensities.tolist())]
+    
+    def _chemical_signal(self, chemical_type: str, concentration, dx, dy,
+                         intensity: Optional[float] = None) -> SensorySignal:
+        if intensity is None:
+            intensity = self.process_signal(concentration)
+        
+        return SensorySignal(
+            signal_type=SensoryType.CHEMORECEPTION,
+            intensity=intensity,
+            direction=(dx, dy) if (dx != 0 or dy != 0) else None,
+            data={
+                'chemical': chemical_type,
+                'concentration': concentration,
+                'gradient_strength': math.sqrt(dx**2 + dy**2)
+            }
+        )
+    
     def _calculate_gradient_direction(self, gradient, position):
         """Calculate direction of strongest increase"""
         x, y = int(position[0]), int(position[1])
+        
+        if isinstance(gradient, np.ndarray):
+            return _gradient_stencil(gradient, x, y)
+            
         dx, dy = 0, 0
         
         # Sample neighboring positions
@@ -201,18 +377,19 @@ class ChemoreceptorSystem(SensoryOrgan):
 
 class MechanoreceptorSystem(SensoryOrgan):
     """Touch/Pressure - detect physical contact and pressure"""
+    __slots__ = ('pressure_threshold', 'vibration_detection')
     
     def __init__(self, sensitivity: float = 0.5):
         super().__init__(SensoryType.MECHANORECEPTION, sensitivity)
         self.pressure_threshold = 0.2 * (1 - sensitivity)
         self.vibration_detection = sensitivity > 0.6
         
-    def perceive(self, environment_state: Dict, cell_position: Tuple[float, float]) -> List[SensorySignal]:
+    def perceive_context(self, ctx: _PerceptionContext) -> List[SensorySignal]:
         signals = []
         
         # Check collisions
-        collisions = environment_state.get('collisions', [])
-        for collision in collisions:
+        cell_position = ctx.cell_pos
+        for collision in ctx.collisions:
             if collision.get('position') == cell_position:
                 force = collision.get('force', 0.5)
                 if force < self.pressure_threshold:
@@ -233,22 +410,29 @@ class MechanoreceptorSystem(SensoryOrgan):
         
         # Detect vibrations if capable
         if self.vibration_detection:
-            vibrations = environment_state.get('vibrations', [])
-            for vib in vibrations:
-                distance = math.sqrt((vib['source'][0] - cell_position[0])**2 + 
-                                   (vib['source'][1] - cell_position[1])**2)
+            threshold = self.pressure_threshold
+            cx, cy = cell_position
+            for vib in ctx.vibrations:
+                dx = vib['source'][0] - cx
+                dy = vib['source'][1] - cy
                 
-                # Vibration intensity decreases with distance
+                # Vibration intensity decreases with distance, so
+                # intensity / (1 + 0.1 * d) > threshold  <=>  d < max_distance
+                if threshold > 0:
+                    max_distance = (vib['intensity'] / threshold - 1.0) / 0.1
+                    if max_distance <= 0 or dx * dx + dy * dy >= max_distance * max_distance:
+                        continue
+                    
+                distance = math.hypot(dx, dy)
                 vib_intensity = vib['intensity'] / (1 + distance * 0.1)
                 
-                if vib_intensity > self.pressure_threshold:
+                if vib_intensity > threshold:
                     intensity = self.process_signal(vib_intensity)
                     
                     signals.append(SensorySignal(
                         signal_type=SensoryType.MECHANORECEPTION,
                         intensity=intensity,
-                        direction=(vib['source'][0] - cell_position[0], 
-                                 vib['source'][1] - cell_position[1]),
+                        direction=(dx, dy),
                         data={
                             'vibration_frequency': vib.get('frequency', 1.0),
                             'vibration_pattern': vib.get('pattern', 'continuous')
@@ -260,36 +444,24 @@ class MechanoreceptorSystem(SensoryOrgan):
 
 class ThermoreceptorSystem(SensoryOrgan):
     """Temperature sensing"""
+    __slots__ = ('optimal_temp', 'temp_range')
     
     def __init__(self, sensitivity: float = 0.5):
         super().__init__(SensoryType.THERMORECEPTION, sensitivity)
         self.optimal_temp = 20.0
         self.temp_range = 40.0  # Can sense ±20°C from optimal
         
-    def perceive(self, environment_state: Dict, cell_position: Tuple[float, float]) -> List[SensorySignal]:
+    def perceive_context(self, ctx: _PerceptionContext) -> List[SensorySignal]:
         signals = []
         
-        # Get temperature at position
-        temperature = environment_state.get('temperature', self.optimal_temp)
-        
-        # Check for local temperature variations
-        temp_map = environment_state.get('temperature_map')
-        if temp_map:
-            x, y = int(cell_position[0]), int(cell_position[1])
-            if hasattr(temp_map, 'shape') and 0 <= x < temp_map.shape[0] and 0 <= y < temp_map.shape[1]:
-                temperature = temp_map[x, y]
-        
-        # Calculate deviation from optimal
-        temp_diff = abs(temperature - self.optimal_temp)
-        if temp_diff > self.temp_range:
-            intensity = 1.0  # Extreme temperature
-        else:
-            intensity = temp_diff / self.temp_range
-            
-        intensity = self.process_signal(intensity)
+        # Get temperature at position, preferring local temperature variations
+        positions = np.array([ctx.cell_xy_int], dtype=np.int64)
+        temperatures, intensities, hot = self.perceive_batch(positions, ctx.temp_map, ctx.temperature)
+        temperature = float(temperatures[0])
+        intensity = float(intensities[0])
         
         # Determine if hot or cold
-        sensation = 'hot' if temperature > self.optimal_temp else 'cold'
+        sensation = 'hot' if hot[0] else 'cold'
         
         signals.append(SensorySignal(
             signal_type=SensoryType.THERMORECEPTION,
@@ -302,19 +474,34 @@ class ThermoreceptorSystem(SensoryOrgan):
         ))
         
         return signals
+    
+    def perceive_batch(self, positions: np.ndarray, temp_map: Optional[np.ndarray],
+                       temperature: Optional[float] = None):
+        """Sense temperature for many cells at once.
+        
+        positions is an (N, 2) integer array of grid coordinates. Returns the
+        sampled temperatures, processed intensities and hot (1) / cold (0) flags.
+        """
+        default_temp = float(self.optimal_temp if temperature is None else temperature)
+        if not isinstance(temp_map, np.ndarray) or temp_map.ndim != 2:
+            temp_map = np.empty((0, 0))
+        temperatures, raw, hot = _thermo_batch(positions, temp_map, default_temp,
+                                               self.optimal_temp, self.temp_range)
+        return temperatures, self.process_signal_batch(raw), hot
 
 
 class ProprioceptorSystem(SensoryOrgan):
     """Self-awareness - body position, energy levels, internal state"""
+    __slots__ = ()
     
     def __init__(self, sensitivity: float = 0.5):
         super().__init__(SensoryType.PROPRIOCEPTION, sensitivity)
         
-    def perceive(self, environment_state: Dict, cell_position: Tuple[float, float]) -> List[SensorySignal]:
+    def perceive_context(self, ctx: _PerceptionContext) -> List[SensorySignal]:
         signals = []
         
         # Get cell's internal state
-        cell_state = environment_state.get('cell_state', {})
+        cell_state = ctx.cell_state
         
         # Energy awareness
         energy = cell_state.get('energy', 100)
@@ -351,19 +538,20 @@ class ProprioceptorSystem(SensoryOrgan):
 
 class NociceptorSystem(SensoryOrgan):
     """Pain/Damage detection"""
+    __slots__ = ('pain_threshold', 'pain_memory', '_pain_counts')
     
     def __init__(self, sensitivity: float = 0.5):
         super().__init__(SensoryType.NOCICEPTION, sensitivity)
         self.pain_threshold = 0.3 * (1 - sensitivity)
-        self.pain_memory = []  # Remember recent pain
+        self.pain_memory = deque(maxlen=10)  # Remember recent pain
+        self._pain_counts = Counter()  # Pain memories per source
         
-    def perceive(self, environment_state: Dict, cell_position: Tuple[float, float]) -> List[SensorySignal]:
+    def perceive_context(self, ctx: _PerceptionContext) -> List[SensorySignal]:
         signals = []
         
         # Check for damage sources
-        damage_events = environment_state.get('damage_events', [])
-        
-        for event in damage_events:
+        cell_position = ctx.cell_pos
+        for event in ctx.damage_events:
             if event.get('target') == cell_position:
                 damage = event.get('amount', 0)
                 if damage < self.pain_threshold:
@@ -371,17 +559,14 @@ class NociceptorSystem(SensoryOrgan):
                     
                 intensity = self.process_signal(min(1, damage))
                 
-                # Remember this pain
-                self.pain_memory.append({
+                # Remember this pain, keeping only recent memories
+                source = event.get('source')
+                self._remember_pain({
                     'damage': damage,
-                    'source': event.get('source'),
+                    'source': source,
                     'type': event.get('damage_type', 'physical')
                 })
                 
-                # Keep only recent pain memories
-                if len(self.pain_memory) > 10:
-                    self.pain_memory.pop(0)
-                
                 signals.append(SensorySignal(
                     signal_type=SensoryType.NOCICEPTION,
                     intensity=intensity,
@@ -389,12 +574,27 @@ class NociceptorSystem(SensoryOrgan):
                     data={
                         'damage': damage,
                         'damage_type': event.get('damage_type', 'physical'),
-                        'continuous': len([p for p in self.pain_memory 
-                                         if p['source'] == event.get('source')]) > 1
+                        'continuous': self._pain_counts[source] > 1
                     }
                 ))
                 
         return signals
+    
+    def _remember_pain(self, memory: Dict):
+        """Append to pain memory, keeping per-source counts in step with evictions"""
+        if len(self.pain_memory) == self.pain_memory.maxlen:
+            evicted = self.pain_memory[0]['source']
+            self._pain_counts[evicted] -= 1
+            if not self._pain_counts[evicted]:
+                del self._pain_counts[evicted]
+        self.pain_memory.append(memory)
+        self._pain_counts[memory['source']] += 1
+
+
+# Habituation table size (power of two) and linear-probe window
+_ADAPT_SLOTS = 256
+_ADAPT_MASK = _ADAPT_SLOTS - 1
+_ADAPT_PROBES = 4
 
 
 class IntegratedSensorySystem:
@@ -433,83 +633,154 @@ class IntegratedSensorySystem:
             sensitivity=genome_traits.get('pain_sensitivity', 0.5)
         )
         
+        # Upkeep of every organ per sensing action
+        self._total_energy_cost = sum(organ.energy_cost for organ in self.organs.values())
+        
         # Sensory integration and processing
         self.attention_capacity = 5 + int(10 * genome_traits.get('neural_complexity', 0.5))
-        self.sensory_memory = deque(maxlen=20)
-        self.sensory_adaptation = defaultdict(float)  # Habituation to repeated stimuli
+        # Rolling memory of focused signals as (signal type code, intensity, timestamp) rows
+        self._memory_ring = np.zeros((20, 3), dtype=np.float64)
+        self._memory_head = 0
+        self._memory_count = 0
+        # Habituation to repeated stimuli: fixed open-addressed table of stimulus signatures
+        self._adapt_vals = np.zeros(_ADAPT_SLOTS, dtype=np.float64)
+        self._adapt_keyhash = np.zeros(_ADAPT_SLOTS, dtype=np.int64)
+        self._adapt_keys = np.full(_ADAPT_SLOTS, None, dtype=object)
         
     def perceive_environment(self, environment_state: Dict, 
                            cell_position: Tuple[float, float]) -> List[SensorySignal]:
         """Gather all sensory information from environment"""
         all_signals = []
-        total_energy_cost = 0
+        total_energy_cost = self._total_energy_cost
+        ctx = _PerceptionContext(environment_state, cell_position)
         
         # Collect signals from all organs
         for organ_type, organ in self.organs.items():
+            if organ.damage > 0.8:
+                continue  # Too damaged to sense anything, but still maintained
             try:
-                signals = organ.perceive(environment_state, cell_position)
-                all_signals.extend(signals)
-                total_energy_cost += organ.energy_cost
+                signals = organ.perceive_context(ctx)
             except Exception as e:
                 # Organ malfunction
-                print(f"Sensory organ {organ_type} failed: {e}")
+                print(f"Sensory organ {organ_type.name} failed: {e}")
                 organ.damage += 0.1
-        
-        # Apply sensory adaptation (habituation)
-        adapted_signals = []
-        for signal in all_signals:
-            # Create signal signature for adaptation tracking
-            sig_key = f"{signal.signal_type}_{signal.source_id}_{signal.data}"
-            
-            # Check adaptation level
-            adaptation = self.sensory_adaptation[sig_key]
+                total_energy_cost -= organ.energy_cost
+                continue
+            all_signals.extend(signals)
+        
+        # Apply sensory adaptation (habituation) to all signals at once
+        updates: Dict[Tuple, float] = {}
+        focused_signals = []
+        n = len(all_signals)
+        if n:
+            intensities = np.fromiter((sig.intensity for sig in all_signals), dtype=np.float64, count=n)
+            levels = np.fromiter((self._adaptation_level(sig.adapt_key) for sig in all_signals),
+                                 dtype=np.float64, count=n)
             
             # Reduce intensity based on adaptation
-            adapted_intensity = signal.intensity * (1 - adaptation * 0.5)
+            adapted = intensities * (1 - levels * 0.5)
+            perceived = np.flatnonzero(adapted > 0.1)  # Threshold for perception
             
-            if adapted_intensity > 0.1:  # Threshold for perception
-                signal.intensity = adapted_intensity
-                adapted_signals.append(signal)
-                
+            for i in perceived.tolist():
+                signal = all_signals[i]
+                signal.intensity = float(adapted[i])
                 # Increase adaptation for this stimulus
-                self.sensory_adaptation[sig_key] = min(1.0, adaptation + 0.1)
-        
-        # Decay adaptation over time
-        for key in list(self.sensory_adaptation.keys()):
-            self.sensory_adaptation[key] *= 0.95
-            if self.sensory_adaptation[key] < 0.01:
-                del self.sensory_adaptation[key]
+                updates[signal.adapt_key] = min(1.0, levels[i] + 0.1)
+            
+            # Select the strongest signals up to attention capacity, then sort only those
+            k = self.attention_capacity
+            if 0 < k < perceived.size:
+                perceived = perceived[np.argpartition(-adapted[perceived], k - 1)[:k]]
+                perceived.sort()
+            order = perceived[np.argsort(-adapted[perceived], kind='stable')]
+            focused_signals = [all_signals[i] for i in order[:k].tolist()]
         
-        # Sort by intensity and limit by attention capacity
-        adapted_signals.sort(key=lambda s: s.intensity, reverse=True)
-        focused_signals = adapted_signals[:self.attention_capacity]
+        self._update_adaptation(updates)
         
         # Store in sensory memory
-        self.sensory_memory.extend(focused_signals)
+        self._remember(focused_signals)
         
         # Return signals and energy cost
         environment_state['sensory_energy_cost'] = total_energy_cost
         
         return focused_signals
     
+    def _remember(self, signals: List[SensorySignal]):
+        """Write signals into the memory ring, overwriting the oldest rows"""
+        size = len(self._memory_ring)
+        signals = signals[-size:]
+        if not signals:
+            return
+        rows = np.array([(sig.signal_type.code, sig.intensity, sig.timestamp) for sig in signals],
+                        dtype=np.float64)
+        slots = (self._memory_head + np.arange(len(rows))) % size
+        self._memory_ring[slots] = rows
+        self._memory_head = int(slots[-1] + 1) % size
+        self._memory_count = min(size, self._memory_count + len(rows))
+    
+    @property
+    def sensory_memory(self) -> np.ndarray:
+        """Recent focused signals, oldest first, as (signal type code, intensity, timestamp) rows"""
+        size = len(self._memory_ring)
+        order = (self._memory_head - self._memory_count + np.arange(self._memory_count)) % size
+        return self._memory_ring[order]
+    
+    @property
+    def sensory_adaptation(self) -> Dict[Tuple, float]:
+        """Current habituation level per stimulus signature"""
+        occupied = np.flatnonzero(self._adapt_vals)
+        return dict(zip(self._adapt_keys[occupied].tolist(), self._adapt_vals[occupied].tolist()))
+    
+    def _adaptation_slot(self, key: Tuple, key_hash: int) -> Optional[int]:
+        """Slot holding key within its probe window, if any"""
+        keys = self._adapt_keys
+        for probe in range(_ADAPT_PROBES):
+            slot = (key_hash + probe) & _ADAPT_MASK
+            if self._adapt_keyhash[slot] == key_hash and keys[slot] == key:
+                return slot
+        return None
+    
+    def _adaptation_level(self, key: Tuple) -> float:
+        slot = self._adaptation_slot(key, hash(key))
+        return 0.0 if slot is None else float(self._adapt_vals[slot])
+    
+    def _update_adaptation(self, updates: Dict[Tuple, float]):
+        """Store new habituation levels, then decay and prune the whole table"""
+        vals = self._adapt_vals
+        for key, level in updates.items():
+            key_hash = hash(key)
+            slot = self._adaptation_slot(key, key_hash)
+            if slot is None:
+                # Take the weakest slot in the probe window; a full window forgets its faintest stimulus
+                window = [(key_hash + probe) & _ADAPT_MASK for probe in range(_ADAPT_PROBES)]
+                slot = min(window, key=vals.__getitem__)
+                self._adapt_keyhash[slot] = key_hash
+                self._adapt_keys[slot] = key
+            vals[slot] = level
+        
+        # Decay adaptation over time, forgetting faded stimuli
+        vals *= 0.95
+        faded = vals < 0.01
+        vals[faded] = 0.0
+        self._adapt_keyhash[faded] = 0
+        self._adapt_keys[faded] = None
+    
     def get_sensory_summary(self) -> Dict[str, Any]:
         """Get summary of current sensory state"""
-        summary = {
-            'active_organs': list(self.organs.keys()),
+        return {
+            'active_organs': list(self.organs),
             'attention_capacity': self.attention_capacity,
-            'recent_signals': len(self.sensory_memory),
-            'adaptation_count': len(self.sensory_adaptation),
-            'organ_status': {}
-        }
-        
-        for organ_type, organ in self.organs.items():
-            summary['organ_status'][organ_type.value] = {
-                'sensitivity': organ.sensitivity,
-                'damage': organ.damage,
-                'functional': organ.damage < 0.8
+            'recent_signals': self._memory_count,
+            'adaptation_count': int(np.count_nonzero(self._adapt_vals)),
+            'organ_status': {
+                organ_type.value: {
+                    'sensitivity': organ.sensitivity,
+                    'damage': organ.damage,
+                    'functional': organ.damage < 0.8
+                }
+                for organ_type, organ in self.organs.items()
             }
-            
-        return summary
+        }
     
     def process_integrated_perception(self, signals: List[SensorySignal]) -> Dict[str, Any]:
         """Integrate multiple sensory signals into unified perception"""
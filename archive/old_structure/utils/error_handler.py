@@ -1,9 +1,15 @@
 """
 BioCode Error Handling Utilities
 """
+import asyncio
+import contextvars
+import itertools
 import logging
-import traceback
-from typing import Optional, Dict, Any, Callable
+import random
+import time
+from collections import Counter, deque
+from operator import itemgetter
+from typing import Optional, Dict, Any, Callable, List
 from functools import wraps
 from datetime import datetime
 
@@ -15,7 +21,17 @@ class BioCodeError(Exception):
     def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
         super().__init__(message)
         self.details = details or {}
-        self.timestamp = datetime.now()
+        self.timestamp_ns = time.time_ns()
+        
+    @property
+    def timestamp(self) -> datetime:
+        """When the error was raised, as local time"""
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9)
+
+
+def iso_timestamp(timestamp_ns: int) -> str:
+    """Format a time.time_ns() value as a local ISO 8601 string"""
+    return datetime.fromtimestamp(timestamp_ns / 1e9).isoformat()
 
 
 class AgentError(BioCodeError):
@@ -56,25 +72,82 @@ def safe_execute(func: Callable, default: Any = None, log_errors: bool = True):
             return func(*args, **kwargs)
         except Exception as e:
             if log_errors:
-                logger.error(f"Error in {func.__name__}: {e}")
-                logger.debug(traceback.format_exc())
+                logger.error("Error in %s: %s", func.__name__, e)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Traceback for %s", func.__name__, exc_info=True)
             return default
     return wrapper
 
 
+# Retry schedule of the current thread or asyncio task: decorated function ->
+# monotonic time of its next retry. Each task starts from a copy of its
+# creator's context, and the dict is replaced rather than mutated, so
+# concurrent tasks never see each other's schedule.
+_retry_schedule: contextvars.ContextVar[Dict[Callable, float]] = contextvars.ContextVar(
+    '_retry_schedule', default={}
+)
+
+
+def _retry_delay(current_delay: float) -> float:
+    """Jittered backoff delay so concurrent retries don't fire in lockstep"""
+    return current_delay * (0.5 + random.random())
+
+
+def _schedule_retry(func: Callable, current_delay: float) -> float:
+    """Seconds to wait before retrying func.
+    
+    Never earlier than a retry this thread or task already scheduled for
+    func, so reentrant or back-to-back failing calls share one backoff while
+    concurrent tasks keep their own jitter.
+    """
+    now = time.monotonic()
+    schedule = _retry_schedule.get()
+    wait = max(_retry_delay(current_delay), schedule.get(func, now) - now)
+    _retry_schedule.set({**schedule, func: now + wait})
+    return wait
+
+
+def _log_failure(func: Callable, attempt: int, max_attempts: int, error: Exception) -> bool:
+    """Log a failed attempt; returns True if another attempt will follow"""
+    if attempt < max_attempts - 1:
+        logger.warning(
+            "%s failed (attempt %d/%d): %s", func.__name__, attempt + 1, max_attempts, error
+        )
+        return True
+    logger.error(
+        "%s failed after %d attempts: %s", func.__name__, max_attempts, error
+    )
+    return False
+
+
+def _backoff_delays(max_attempts: int, delay: float, backoff: float) -> tuple:
+    """Delay before each retry: delay, delay * backoff, delay * backoff ** 2, ..."""
+    return tuple(delay * backoff ** attempt for attempt in range(max(max_attempts - 1, 0)))
+
+
 def retry_on_error(max_attempts: int = 3, delay: float = 1.0, backoff: float = 2.0):
     """
     Retry decorator for functions that may fail
     
+    Coroutine functions are retried with aretry_on_error so backoff does
+    not block the event loop. With max_attempts=1 the function is returned
+    undecorated.
+    
     Args:
         max_attempts: Maximum number of attempts
         delay: Initial delay between attempts
         backoff: Multiplier for delay after each failure
     """
+    delays = _backoff_delays(max_attempts, delay, backoff)
+    
     def decorator(func):
+        if max_attempts == 1:
+            return func  # Nothing to retry
+        if asyncio.iscoroutinefunction(func):
+            return aretry_on_error(max_attempts, delay, backoff)(func)
+            
         @wraps(func)
         def wrapper(*args, **kwargs):
-            current_delay = delay
             last_error = None
             
             for attempt in range(max_attempts):
@@ -82,16 +155,37 @@ def retry_on_error(max_attempts: int = 3, delay: float = 1.0, backoff: float = 2
                     return func(*args, **kwargs)
                 except Exception as e:
                     last_error = e
-                    if attempt < max_attempts - 1:
-                        logger.warning(
-                            f"{func.__name__} failed (attempt {attempt + 1}/{max_attempts}): {e}"
-                        )
-                        time.sleep(current_delay)
-                        current_delay *= backoff
-                    else:
-                        logger.error(
-                            f"{func.__name__} failed after {max_attempts} attempts: {e}"
-                        )
+                    if _log_failure(func, attempt, max_attempts, e):
+                        time.sleep(_schedule_retry(func, delays[attempt]))
+            
+            raise last_error
+        return wrapper
+    return decorator
+
+
+def aretry_on_error(max_attempts: int = 3, delay: float = 1.0, backoff: float = 2.0):
+    """
+    Retry decorator for coroutine functions that may fail
+    
+    Args:
+        max_attempts: Maximum number of attempts
+        delay: Initial delay between attempts
+        backoff: Multiplier for delay after each failure
+    """
+    delays = _backoff_delays(max_attempts, delay, backoff)
+    
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            last_error = None
+            
+            for attempt in range(max_attempts):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    last_error = e
+                    if _log_failure(func, attempt, max_attempts, e):
+                        await asyncio.sleep(_schedule_retry(func, delays[attempt]))
             
             raise last_error
         return wrapper
@@ -111,55 +205,74 @@ def handle_agent_error(agent_id: str, error: Exception, context: Optional[Dict[s
         'agent_id': agent_id,
         'error_type': type(error).__name__,
         'error_message': str(error),
-        'timestamp': datetime.now().isoformat(),
+        'timestamp_ns': time.time_ns(),  # See iso_timestamp()
         'context': context or {}
     }
     
     # Log error with full traceback
-    logger.error(f"Agent {agent_id} error: {error}")
-    logger.debug(f"Error details: {error_info}")
-    logger.debug(traceback.format_exc())
+    logger.error("Agent %s error: %s", agent_id, error)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Error details: %s", error_info, exc_info=error)
     
     # Return error info for potential recovery
     return error_info
 
 
 class ErrorCollector:
-    """Collect and analyze errors across the system"""
+    """Collect and analyze errors across the system
+    
+    Errors go into a fixed ring of slots indexed by a global counter, so
+    adding needs no lock; readers take an ordered snapshot of the ring.
+    Under concurrent writes a snapshot may miss an in-flight error, which
+    is acceptable for diagnostics.
+    """
     
     def __init__(self, max_errors: int = 1000):
-        self.errors = deque(maxlen=max_errors)
-        self._lock = threading.RLock()
+        if max_errors < 1:
+            raise ValueError(f"max_errors must be at least 1, got {max_errors}")
+        self.max_errors = max_errors
+        self._buffer: List[Optional[tuple]] = [None] * max_errors  # (sequence, error_info)
+        self._sequence = itertools.count()  # next() is atomic under the GIL
+        
+    @property
+    def errors(self) -> deque:
+        """Collected errors, oldest first
+        
+        This is a copy taken when the property is read: changing it does
+        not affect the collector. Use add_error() and clear() instead.
+        """
+        return deque(self._snapshot(), maxlen=self.max_errors)
         
     def add_error(self, error_info: Dict[str, Any]):
         """Add error to collection"""
-        with self._lock:
-            self.errors.append(error_info)
+        sequence = next(self._sequence)
+        self._buffer[sequence % self.max_errors] = (sequence, error_info)
+        
+    def _snapshot(self) -> List[Dict[str, Any]]:
+        """Errors currently in the ring, oldest first"""
+        entries = [entry for entry in self._buffer if entry is not None]
+        entries.sort(key=itemgetter(0))
+        return [error for _, error in entries]
             
     def get_error_summary(self) -> Dict[str, Any]:
         """Get summary of collected errors"""
-        with self._lock:
-            if not self.errors:
-                return {'total_errors': 0}
-                
-            error_types = defaultdict(int)
-            agent_errors = defaultdict(int)
+        errors = self._snapshot()
+        if not errors:
+            return {'total_errors': 0}
+            
+        error_types = Counter(error.get('error_type', 'Unknown') for error in errors)
+        agent_errors = Counter(error.get('agent_id', 'Unknown') for error in errors)
             
-            for error in self.errors:
-                error_types[error.get('error_type', 'Unknown')] += 1
-                agent_errors[error.get('agent_id', 'Unknown')] += 1
-                
-            return {
-                'total_errors': len(self.errors),
-                'error_types': dict(error_types),
-                'errors_by_agent': dict(agent_errors),
-                'recent_errors': list(self.errors)[-10:]
-            }
+        return {
+            'total_errors': len(errors),
+            'error_types': dict(error_types),
+            'errors_by_agent': dict(agent_errors),
+            'recent_errors': errors[-10:]
+        }
             
     def clear(self):
         """Clear error collection"""
-        with self._lock:
-            self.errors.clear()
+        self._buffer = [None] * self.max_errors
 
 
 # Global error collector
@@ -169,9 +282,3 @@ _error_collector = ErrorCollector()
 def get_error_collector() -> ErrorCollector:
     """Get global error collector instance"""
     return _error_collector
-
-
-# Import required modules
-import time
-import threading
-from collections import deque, defaultdict
\ No newline at end of file
@@ -5,11 +5,15 @@ This module provides consistent logging setup across all BioCode components,
 following biological metaphors for log levels and contexts.
 """
 
+import atexit
+import copy
+import functools
 import logging
 import logging.handlers
 import os
 import sys
-from datetime import datetime
+import threading
+import time
 from enum import Enum
 from pathlib import Path
 from typing import Any, Dict, Optional
@@ -25,6 +29,22 @@ class BiologicalLogLevel(Enum):
     CRITICAL = logging.CRITICAL  # Life-threatening events
 
 
+def _bio_context_str(
+    cell_id: Optional[str] = None,
+    tissue_name: Optional[str] = None,
+    organ_name: Optional[str] = None,
+) -> str:
+    """Render biological context as "[Cell:x > Tissue:y > Organ:z]" ("" if none)"""
+    bio_context = []
+    if cell_id is not None:
+        bio_context.append(f"Cell:{cell_id}")
+    if tissue_name is not None:
+        bio_context.append(f"Tissue:{tissue_name}")
+    if organ_name is not None:
+        bio_context.append(f"Organ:{organ_name}")
+    return f"[{' > '.join(bio_context)}]" if bio_context else ""
+
+
 class BioCodeFormatter(logging.Formatter):
     """Custom formatter with biological context"""
 
@@ -36,41 +56,107 @@ class BioCodeFormatter(logging.Formatter):
         logging.CRITICAL: "\033[35m",  # Magenta
     }
     RESET = "\033[0m"
+    # timestamp.millis | level | logger [context] | message
+    LINE_FORMAT = "%s.%03d | %-8s | %s %s | %s"
 
     def __init__(self, use_colors: bool = True):
         self.use_colors = use_colors and sys.stdout.isatty()
+        self._second_stamp = (None, "")  # (epoch second, formatted "%Y-%m-%d %H:%M:%S")
+        self._colored_levels = {
+            levelno: f"{color}{logging.getLevelName(levelno)}{self.RESET}"
+            for levelno, color in self.COLORS.items()
+        }
         super().__init__()
+        # Pick the color or plain variant once instead of per record
+        self.format = self._format_color if self.use_colors else self._format_plain
 
     def format(self, record: logging.LogRecord) -> str:
         """Format log record with biological context"""
-        # Add biological context if available
-        bio_context = []
-        if hasattr(record, "cell_id"):
-            bio_context.append(f"Cell:{record.cell_id}")
-        if hasattr(record, "tissue_name"):
-            bio_context.append(f"Tissue:{record.tissue_name}")
-        if hasattr(record, "organ_name"):
-            bio_context.append(f"Organ:{record.organ_name}")
-
-        context_str = f"[{' > '.join(bio_context)}]" if bio_context else ""
-
-        # Format timestamp
-        timestamp = datetime.fromtimestamp(record.created).strftime(
-            "%Y-%m-%d %H:%M:%S.%f"
-        )[:-3]
+        if self.use_colors:
+            return self._format_color(record)
+        return self._format_plain(record)
+
+    def _format_color(self, record: logging.LogRecord) -> str:
+        level_name = self._colored_levels.get(record.levelno, record.levelname)
+        return self._format_record(record, level_name)
+
+    def _format_plain(self, record: logging.LogRecord) -> str:
+        return self._format_record(record, record.levelname)
+
+    def _format_record(self, record: logging.LogRecord, level_name: str) -> str:
+        # Biological context, prerendered by BioCodeLogger adapters
+        context_str = getattr(record, "_bio_context_str", None)
+        if context_str is None:
+            context_str = _bio_context_str(
+                getattr(record, "cell_id", None),
+                getattr(record, "tissue_name", None),
+                getattr(record, "organ_name", None),
+            )
+
+        # Format timestamp; the date/time part only changes once per second
+        second = int(record.created)
+        cached_second, stamp = self._second_stamp
+        if second != cached_second:
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))
+            self._second_stamp = (second, stamp)
 
         # Build log message
-        level_name = record.levelname
-        if self.use_colors and record.levelno in self.COLORS:
-            level_name = f"{self.COLORS[record.levelno]}{level_name}{self.RESET}"
+        message = self.LINE_FORMAT % (
+            stamp, record.msecs, level_name, record.name, context_str, record.getMessage()
+        )
+
+        # Add exception info if present, formatting the traceback once per
+        # record rather than once per handler
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            message = "%s\n%s" % (message, record.exc_text)
+
+        return message
+
 
-        message = f"{timestamp} | {level_name:8} | {record.name} {context_str} | {record.getMessage()}"
+class _PreparedMemoryHandler(logging.handlers.MemoryHandler):
+    """MemoryHandler that renders each record when it is logged, not when flushed"""
 
-        # Add exception info if present
+    _exc_formatter = logging.Formatter()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        super().emit(self.prepare(record))
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Copy of record with the message and traceback already rendered
+
+        Like QueueHandler.prepare: later changes to mutable args cannot alter
+        the buffered line, and the traceback frames are not kept alive.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
         if record.exc_info:
-            message += f"\n{self.formatException(record.exc_info)}"
+            if not record.exc_text:
+                record.exc_text = self._exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
 
-        return message
+
+class _PeriodicFlusher(threading.Thread):
+    """Daemon thread that flushes buffered handlers at a fixed interval"""
+
+    def __init__(self, handler: logging.Handler, interval: float):
+        super().__init__(name="biocode-log-flush", daemon=True)
+        self.handler = handler
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.handler.flush()
+
+    def stop(self) -> None:
+        """Stop the thread and write out anything still buffered"""
+        self._stop_event.set()
+        self.handler.flush()
 
 
 class BioCodeLogger:
@@ -79,6 +165,10 @@ class BioCodeLogger:
     _loggers: Dict[str, logging.Logger] = {}
     _initialized: bool = False
     _log_dir: Optional[Path] = None
+    _flusher: Optional[_PeriodicFlusher] = None
+    _security_handler_attached: bool = False
+    _init_lock = threading.Lock()
+    _security_lock = threading.Lock()
 
     @classmethod
     def setup_logging(
@@ -89,6 +179,8 @@ class BioCodeLogger:
         enable_console_logging: bool = True,
         max_file_size: int = 10 * 1024 * 1024,  # 10MB
         backup_count: int = 5,
+        buffer_capacity: int = 1024,
+        flush_interval: float = 30.0,
     ) -> None:
         """
         Setup global logging configuration
@@ -100,10 +192,33 @@ class BioCodeLogger:
             enable_console_logging: Whether to log to console
             max_file_size: Maximum size of each log file before rotation
             backup_count: Number of backup files to keep
+            buffer_capacity: Records buffered before the main log file is written
+            flush_interval: Seconds between periodic flushes of the main log file
         """
         if cls._initialized:
             return
+        with cls._init_lock:
+            if cls._initialized:
+                return
+            cls._install_handlers(
+                log_level, log_dir, enable_file_logging, enable_console_logging,
+                max_file_size, backup_count, buffer_capacity, flush_interval,
+            )
+            cls._initialized = True
 
+    @classmethod
+    def _install_handlers(
+        cls,
+        log_level: str,
+        log_dir: Optional[str],
+        enable_file_logging: bool,
+        enable_console_logging: bool,
+        max_file_size: int,
+        backup_count: int,
+        buffer_capacity: int,
+        flush_interval: float,
+    ) -> None:
+        """Configure the root logger; called once under the init lock"""
         # Set log directory
         if log_dir:
             cls._log_dir = Path(log_dir)
@@ -135,7 +250,18 @@ class BioCodeLogger:
                 backupCount=backup_count,
             )
             file_handler.setFormatter(BioCodeFormatter(use_colors=False))
-            root_logger.addHandler(file_handler)
+
+            # Buffer writes; errors and a full buffer flush immediately
+            buffered_handler = _PreparedMemoryHandler(
+                capacity=buffer_capacity,
+                flushLevel=logging.ERROR,
+                target=file_handler,
+            )
+            root_logger.addHandler(buffered_handler)
+
+            cls._flusher = _PeriodicFlusher(buffered_handler, flush_interval)
+            cls._flusher.start()
+            atexit.register(cls._flusher.stop)
 
             # Error log file
             error_handler = logging.handlers.RotatingFileHandler(
@@ -147,8 +273,6 @@ class BioCodeLogger:
             error_handler.setFormatter(BioCodeFormatter(use_colors=False))
             root_logger.addHandler(error_handler)
 
-        cls._initialized = True
-
     @classmethod
     def get_logger(
         cls,
@@ -180,7 +304,20 @@ class BioCodeLogger:
         else:
             logger = cls._loggers[name]
 
-        # Create adapter with biological context
+        # Reuse an adapter with this biological context
+        if cell_id or tissue_name or organ_name:
+            return cls._context_adapter(logger, cell_id, tissue_name, organ_name)
+        return logger
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _context_adapter(
+        logger: logging.Logger,
+        cell_id: Optional[str],
+        tissue_name: Optional[str],
+        organ_name: Optional[str],
+    ) -> logging.LoggerAdapter:
+        """Create adapter with biological context (cached per logger and context)"""
         extra = {}
         if cell_id:
             extra["cell_id"] = cell_id
@@ -189,9 +326,10 @@ class BioCodeLogger:
         if organ_name:
             extra["organ_name"] = organ_name
 
-        if extra:
-            return logging.LoggerAdapter(logger, extra)
-        return logger
+        extra["_bio_context_str"] = _bio_context_str(
+            extra.get("cell_id"), extra.get("tissue_name"), extra.get("organ_name")
+        )
+        return logging.LoggerAdapter(logger, extra)
 
     @classmethod
     def get_performance_logger(cls) -> logging.Logger:
@@ -205,21 +343,25 @@ class BioCodeLogger:
     def get_security_logger(cls) -> logging.Logger:
         """Get specialized logger for security events"""
         logger = cls.get_logger("biocode.security")
+        if cls._security_handler_attached:
+            return logger
 
         # Add security-specific file handler if not already added
-        if cls._initialized and cls._log_dir:
-            security_log = cls._log_dir / "biocode_security.log"
-            has_security_handler = any(
-                isinstance(h, logging.FileHandler) and h.baseFilename == str(security_log)
-                for h in logger.handlers
-            )
-
-            if not has_security_handler:
-                security_handler = logging.handlers.RotatingFileHandler(
-                    security_log, maxBytes=10 * 1024 * 1024, backupCount=10
+        with cls._security_lock:
+            if not cls._security_handler_attached and cls._initialized and cls._log_dir:
+                security_log = cls._log_dir / "biocode_security.log"
+                has_security_handler = any(
+                    isinstance(h, logging.FileHandler) and h.baseFilename == str(security_log)
+                    for h in logger.handlers
                 )
-                security_handler.setFormatter(BioCodeFormatter(use_colors=False))
-                logger.addHandler(security_handler)
+
+                if not has_security_handler:
+                    security_handler = logging.handlers.RotatingFileHandler(
+                        security_log, maxBytes=10 * 1024 * 1024, backupCount=10
+                    )
+                    security_handler.setFormatter(BioCodeFormatter(use_colors=False))
+                    logger.addHandler(security_handler)
+                cls._security_handler_attached = True
 
         return logger
 
@@ -264,7 +406,7 @@ def log_cell_event(
 ) -> None:
     """Log cell-level events"""
     extra = {"cell_id": cell_id, **kwargs}
-    logger.debug(f"Cell Event: {event}", extra=extra)
+    logger.debug("Cell Event: %s", event, extra=extra)
 
 
 def log_tissue_event(
@@ -272,12 +414,12 @@ def log_tissue_event(
 ) -> None:
     """Log tissue-level events"""
     extra = {"tissue_name": tissue_name, **kwargs}
-    logger.info(f"Tissue Event: {event}", extra=extra)
+    logger.info("Tissue Event: %s", event, extra=extra)
 
 
 def log_system_event(logger: logging.Logger, event: str, **kwargs: Any) -> None:
     """Log system-level events"""
-    logger.warning(f"System Event: {event}", extra=kwargs)
+    logger.warning("System Event: %s", event, extra=kwargs)
 
 
 def log_security_event(
@@ -286,4 +428,4 @@ def log_security_event(
     """Log security-related events"""
     security_logger = BioCodeLogger.get_security_logger()
     log_method = getattr(security_logger, severity.lower(), security_logger.warning)
-    log_method(f"Security Event: {event}", extra={"details": details, **kwargs})
\ No newline at end of file
+    log_method("Security Event: %s", event, extra={"details": details, **kwargs})
\ No newline at end of file
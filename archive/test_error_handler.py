@@ -0,0 +1,157 @@
+"""
+Tests for error handling utilities
+"""
+import pytest
+import asyncio
+import threading
+import time
+import sys
+import os
+from unittest.mock import patch
+
+# Add old_structure to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'old_structure'))
+
+from utils.error_handler import (
+    ErrorCollector, retry_on_error, aretry_on_error, _schedule_retry
+)
+
+
+class TestRetry:
+    """Test retry decorators and their shared backoff"""
+    
+    def test_aretry_retries_without_blocking_loop(self):
+        """A failing coroutine is awaited max_attempts times while the loop keeps running"""
+        attempts = []
+        
+        @aretry_on_error(max_attempts=3, delay=0.02, backoff=1.0)
+        async def flaky():
+            attempts.append(time.monotonic())
+            raise ConnectionError("down")
+        
+        async def main():
+            ticks = 0
+            
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.001)
+                    ticks += 1
+            
+            task = asyncio.create_task(ticker())
+            with pytest.raises(ConnectionError):
+                await flaky()
+            task.cancel()
+            return ticks
+        
+        ticks = asyncio.run(main())
+        assert len(attempts) == 3
+        assert ticks > 5  # Other tasks ran during the backoff sleeps
+    
+    def test_retry_on_error_dispatches_coroutines(self):
+        """retry_on_error on a coroutine function retries it asynchronously"""
+        calls = []
+        
+        @retry_on_error(max_attempts=2, delay=0.001)
+        async def succeeds_second_time():
+            calls.append(1)
+            if len(calls) == 1:
+                raise ValueError("first call fails")
+            return "ok"
+        
+        assert asyncio.iscoroutinefunction(succeeds_second_time)
+        assert asyncio.run(succeeds_second_time()) == "ok"
+        assert len(calls) == 2
+    
+    def test_backoff_shared_per_thread(self):
+        """Back-to-back failures of one function share a thread's backoff, not other threads'"""
+        def func():
+            pass
+        
+        with patch('utils.error_handler.random.random', return_value=0.5):
+            first = _schedule_retry(func, 1.0)
+            second = _schedule_retry(func, 0.01)
+            
+            other = []
+            thread = threading.Thread(target=lambda: other.append(_schedule_retry(func, 0.01)))
+            thread.start()
+            thread.join()
+        
+        assert first == pytest.approx(1.0)
+        assert second > 0.9  # Waits for the retry already scheduled in this thread
+        assert other == [pytest.approx(0.01)]
+
+    
+    def test_backoff_independent_per_task(self):
+        """Concurrent coroutines keep their own jittered backoff for the same function"""
+        def func():
+            pass
+        
+        async def schedule(current_delay):
+            return _schedule_retry(func, current_delay)
+        
+        async def main():
+            return await asyncio.gather(schedule(1.0), schedule(0.01))
+        
+        with patch('utils.error_handler.random.random', return_value=0.5):
+            first, second = asyncio.run(main())
+        
+        assert first == pytest.approx(1.0)
+        assert second == pytest.approx(0.01)  # Not pushed onto the first task's retry time
+
+class TestErrorCollector:
+    """Test the lock-free error ring"""
+    
+    def test_keeps_most_recent_errors(self):
+        """A full ring drops the oldest errors"""
+        collector = ErrorCollector(max_errors=3)
+        for i in range(5):
+            collector.add_error({'agent_id': f"agent_{i}", 'error_type': 'ValueError'})
+        
+        assert [error['agent_id'] for error in collector.errors] == ['agent_2', 'agent_3', 'agent_4']
+        summary = collector.get_error_summary()
+        assert summary['total_errors'] == 3
+        assert summary['error_types'] == {'ValueError': 3}
+    
+    def test_errors_is_a_copy(self):
+        """Changing the errors snapshot leaves the collector untouched"""
+        collector = ErrorCollector()
+        collector.add_error({'agent_id': 'agent_0', 'error_type': 'ValueError'})
+        
+        collector.errors.clear()
+        assert len(collector.errors) == 1
+        
+        collector.clear()
+        assert collector.get_error_summary() == {'total_errors': 0}
+    
+    def test_rejects_empty_ring(self):
+        """max_errors must leave room for at least one error"""
+        with pytest.raises(ValueError):
+            ErrorCollector(max_errors=0)
+    
+    def test_concurrent_add_error(self):
+        """Errors added from many threads are all kept, in sequence order"""
+        collector = ErrorCollector(max_errors=10000)
+        n_threads, per_thread = 8, 500
+        start = threading.Barrier(n_threads)
+        
+        def worker(thread_id):
+            start.wait()
+            for i in range(per_thread):
+                collector.add_error({'agent_id': f"thread_{thread_id}", 'error_type': str(i)})
+        
+        threads = [threading.Thread(target=worker, args=(t,)) for t in range(n_threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        errors = list(collector.errors)
+        assert len(errors) == n_threads * per_thread
+        assert collector.get_error_summary()['errors_by_agent'] == {
+            f"thread_{t}": per_thread for t in range(n_threads)
+        }
+        # Each thread's errors keep the order they were added in
+        for t in range(n_threads):
+            own = [int(error['error_type']) for error in errors if error['agent_id'] == f"thread_{t}"]
+            assert own == list(range(per_thread))
@@ -14,7 +14,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from src.evolution.digital_life import (
     DigitalDNA, SelfReplicatingCell, ApoptoticCell,
     AdaptiveCell, HiveMindCell, CollectiveIntelligence,
-    EvolutionSimulator
+    EvolutionSimulator, StressSampler, CellArchive
 )
 from src.evolution.sensory_system import (
     SensoryType, SensorySignal, VisualSystem,
@@ -26,11 +26,11 @@ from src.evolution.evolutionary_scenarios import (
 )
 from src.evolution.digital_ecosystem import (
     TrophicLevel, Species, Organism, Ecosystem,
-    FoodWeb, InteractionType
+    FoodWeb, InteractionType, create_example_ecosystem
 )
 from src.evolution.horizontal_gene_transfer import (
     GeneticElement, PlasmidVector, ViralVector,
-    HGTNetwork, LivingCodeOrganism
+    HGTNetwork, LivingCodeOrganism, UniformGrid
 )
 
 
@@ -65,6 +65,28 @@ class TestDigitalDNA:
         assert child.generation == max(parent1.generation, parent2.generation) + 1
         assert child.genes['behavior'] in ['aggressive', 'defensive']
         assert child.genes['metabolism'] in ['fast', 'slow']
+    
+    def test_batch_crossover(self):
+        """Batch crossover matches crossover() pair by pair"""
+        parents_a = [DigitalDNA({'behavior': 'aggressive', 'metabolism': 'fast', 'lifespan': 10})
+                     for _ in range(4)]
+        parents_b = [DigitalDNA({'behavior': 'defensive', 'metabolism': 'slow'}) for _ in range(4)]
+        parents_b[0] = parents_b[0].mutate()
+        
+        children = DigitalDNA.batch_crossover(parents_a, parents_b)
+        
+        assert len(children) == 4
+        for parent_a, parent_b, child in zip(parents_a, parents_b, children):
+            expected = parent_a.crossover(parent_b)
+            assert child.generation == expected.generation
+            assert child.lineage_id == expected.lineage_id
+            assert list(child.genes) == list(expected.genes)
+            for gene, value in child.genes.items():
+                assert value in (parent_a.genes[gene], parent_b.genes.get(gene, parent_a.genes[gene]))
+        
+        assert DigitalDNA.batch_crossover([], []) == []
+        with pytest.raises(ValueError):
+            DigitalDNA.batch_crossover(parents_a, parents_b[:2])
 
 
 class TestSelfReplicatingCell:
@@ -90,24 +112,41 @@ class TestSelfReplicatingCell:
     
     def test_mitosis_with_file_save(self, tmp_path):
         """Test saving cell to file"""
-        import tempfile
-        with tempfile.TemporaryDirectory() as tmpdir:
-            os.chdir(tmpdir)
-            
-            parent = SelfReplicatingCell()
-            child = parent.mitosis(save_to_file=True)
-            
-            # Check file was created
-            expected_file = f"digital_life_forms/cell_{child.id}_{child.dna.generation}.py"
-            assert os.path.exists(expected_file)
+        parent = SelfReplicatingCell()
+        child = parent.mitosis(save_to_file=True, output_dir=tmp_path / "digital_life_forms")
+        
+        # Check file was created
+        expected_file = tmp_path / "digital_life_forms" / f"cell_{child.id}_{child.dna.generation}.py"
+        assert expected_file.exists()
+    
+    def test_mitosis_with_archive(self, tmp_path):
+        """Archived cells read back as one JSON record per line"""
+        parent = SelfReplicatingCell()
+        path = tmp_path / "digital_life_forms" / "cells.jsonl"
+        
+        with CellArchive(path) as archive:
+            children = [parent.mitosis(archive=archive) for _ in range(3)]
+        
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert len(records) == 3
+        for record, child in zip(records, children):
+            assert record == {
+                'cell_id': child.id,
+                'generation': child.dna.generation,
+                'lineage': child.dna.lineage_id,
+                'dna': child.dna.genes,
+                'mutations': child.mutations
+            }
+        assert not list(tmp_path.glob("digital_life_forms/*.py"))
 
 
 class TestApoptoticCell:
     """Test programmed cell death"""
     
-    def test_death_signals(self):
+    def test_death_signals(self, tmp_path):
         """Test apoptosis triggering"""
         cell = ApoptoticCell()
+        cell.memory_dir = tmp_path / "genetic_memory"
         assert cell.state == "healthy"
         
         # Send death signals
@@ -118,9 +157,11 @@ class TestApoptoticCell:
         cell.receive_death_signal("Energy depletion")
         assert cell.state == "dead"  # Triggered after 3 signals
     
-    def test_stress_response(self):
+    def test_stress_response(self, tmp_path):
         """Test stress-induced apoptosis"""
         cell = ApoptoticCell()
+        cell.memory_dir = tmp_path / "genetic_memory"
+        cell.stress_sampler = StressSampler(ttl=0)  # Read the patched psutil every check
         
         # Simulate high stress
         with patch('psutil.cpu_percent', return_value=95):
@@ -134,23 +175,21 @@ class TestApoptoticCell:
     
     def test_genetic_memory_save(self, tmp_path):
         """Test saving genetic memory before death"""
-        import tempfile
-        with tempfile.TemporaryDirectory() as tmpdir:
-            os.chdir(tmpdir)
-            
-            cell = ApoptoticCell()
-            cell._save_genetic_memory()
-            
-            # Check memory file exists
-            assert os.path.exists("genetic_memory")
-            files = os.listdir("genetic_memory")
-            assert len(files) == 1
-            
-            # Verify content
-            with open(os.path.join("genetic_memory", files[0])) as f:
-                memory = json.load(f)
-                assert memory['cell_id'] == cell.id
-                assert 'dna' in memory
+        memory_dir = tmp_path / "genetic_memory"
+        
+        cell = ApoptoticCell()
+        cell._save_genetic_memory(memory_dir)
+        
+        # Check memory file exists
+        assert memory_dir.exists()
+        files = os.listdir(memory_dir)
+        assert len(files) == 1
+        
+        # Verify content
+        with open(memory_dir / files[0]) as f:
+            memory = json.load(f)
+            assert memory['cell_id'] == cell.id
+            assert 'dna' in memory
 
 
 class TestSensorySystem:
@@ -174,6 +213,20 @@ class TestSensorySystem:
         assert signals[0].data['entity_type'] == 'food'
         assert signals[0].data['distance'] == 10.0
     
+    def test_visual_system_sees_moved_entity(self):
+        """Entities moved in place are seen at their new position"""
+        vision = VisualSystem(sensitivity=0.8, field_of_view=120)
+        entity = {'id': 'prey1', 'type': 'food', 'position': (100, 100)}
+        environment = {'light_level': 0.8, 'cell_facing': 0, 'entities': [entity]}
+        
+        assert vision.perceive(environment, (0, 0)) == []
+        
+        entity['position'] = (5, 0)
+        signals = vision.perceive(environment, (0, 0))
+        assert len(signals) == 1
+        assert signals[0].data['distance'] == 5.0
+        assert set(environment) == {'light_level', 'cell_facing', 'entities'}
+    
     def test_chemoreceptor_system(self):
         """Test chemical sensing"""
         chemo = ChemoreceptorSystem(sensitivity=0.7)
@@ -190,6 +243,15 @@ class TestSensorySystem:
         assert signals[0].data['chemical'] == 'food'
         assert signals[0].data['concentration'] == 0.8
     
+    def test_chemoreceptor_off_map(self):
+        """Positions outside an array gradient have no direction"""
+        chemo = ChemoreceptorSystem(sensitivity=1.0)
+        environment = {'chemical_gradients': {'food': np.ones((3, 3))}}
+        
+        for position in [(300000.0, 300000.0), (3.0, 1.0), (-1.0, 1.0)]:
+            for signal in chemo.perceive(environment, position):
+                assert signal.direction is None
+    
     def test_integrated_sensory_system(self):
         """Test complete sensory integration"""
         genome_traits = {
@@ -214,6 +276,7 @@ class TestSensorySystem:
         perception = sensory.process_integrated_perception(test_signals)
         assert perception['threat_level'] > 0
         assert perception['opportunity_level'] > 0
+        assert sensory.get_sensory_summary()['organ_status']['smell']['functional']
 
 
 class TestEvolutionaryScenarios:
@@ -250,6 +313,51 @@ class TestEvolutionaryScenarios:
         assert good_fitness > 1.0  # Beneficial
         assert bad_fitness < 1.0   # Detrimental
     
+    def test_population_fitness_matches_scalar(self):
+        """The batch kernel agrees with calculate_fitness_modifier, missing traits included"""
+        pressure = SelectionPressure(
+            "cold_adaptation",
+            {'metabolism': 0.3, 'insulation': 0.9, 'size': 0.7},
+            strength=2.0
+        )
+        population = [
+            {'metabolism': 0.3, 'insulation': 0.85, 'size': 0.1},
+            {'metabolism': 0.8},
+            {'insulation': 0.2, 'speed': 0.5},
+            {},
+            {'speed': 0.9}
+        ]
+        
+        expected = [pressure.calculate_fitness_modifier(traits) for traits in population]
+        assert pressure.calculate_population_fitness(population).tolist() == pytest.approx(expected)
+        
+        pressure.active = False
+        assert pressure.calculate_population_fitness(population).tolist() == [1.0] * 5
+    
+    def test_trait_preferences_read_only(self):
+        """Preferences cannot be edited in place; reassigning refreshes the batch arrays"""
+        pressure = SelectionPressure("heat", {'insulation': 0.1})
+        
+        with pytest.raises(TypeError):
+            pressure.trait_preferences['size'] = 0.5
+        
+        pressure.trait_preferences = {'insulation': 0.2, 'size': 0.5}
+        assert pressure.trait_names == ('insulation', 'size')
+        assert pressure.optimal.tolist() == [0.2, 0.5]
+        traits = {'insulation': 0.4, 'size': 0.5}
+        assert pressure.calculate_population_fitness([traits])[0] == pytest.approx(
+            pressure.calculate_fitness_modifier(traits))
+    
+    def test_scenario_population_fitness(self):
+        """A scenario multiplies the modifiers of all its selection pressures"""
+        scenario = ScenarioLibrary.create_cambrian_explosion()
+        population = [{'vision': 0.4, 'speed': 0.9}, {'defense': 0.7, 'size': 0.2}, {}]
+        
+        expected = np.ones(len(population))
+        for pressure in scenario.selection_pressures:
+            expected *= [pressure.calculate_fitness_modifier(traits) for traits in population]
+        assert scenario.population_fitness(population).tolist() == pytest.approx(expected.tolist())
+    
     def test_pathogen(self):
         """Test disease dynamics"""
         pathogen = Pathogen("TestVirus", virulence=0.8, lethality=0.3)
@@ -271,6 +379,71 @@ class TestEvolutionaryScenarios:
         deaths = pathogen.cause_mortality()
         assert isinstance(deaths, list)
     
+    def test_spread_matches_scalar(self):
+        """CSR spread infects exactly the hosts the per-edge loop infects with the same draws"""
+        rng = np.random.default_rng(11)
+        hosts = [f"host{i}" for i in range(40)]
+        contact_network = {
+            host: [hosts[j] for j in rng.choice(40, size=int(rng.integers(0, 6)), replace=False)]
+            for host in hosts[:30]
+        }
+        module = sys.modules[Pathogen.__module__]
+        network = Pathogen.compile_network(contact_network)
+        infected_total = 0
+        
+        for seed in range(5):
+            pathogen = Pathogen("TestVirus", transmissibility=0.4)
+            pathogen.infected_hosts = set(hosts[seed:40:7]) | {"stranger"}
+            pathogen.immune_hosts = {hosts[3], hosts[20]}
+            
+            # Scalar baseline: one draw per contact edge, hosts in set order
+            draws = iter(np.random.default_rng(seed).random(1000).tolist())
+            expected = set()
+            for infected in list(pathogen.infected_hosts):
+                for contact in contact_network.get(infected, []):
+                    if next(draws) < pathogen.transmissibility:
+                        if contact not in pathogen.infected_hosts and contact not in pathogen.immune_hosts:
+                            expected.add(contact)
+            
+            with patch.object(module, '_rng', np.random.default_rng(seed)):
+                new_infections = pathogen.spread(network)
+            
+            assert sorted(new_infections) == sorted(expected)
+            assert expected <= pathogen.infected_hosts
+            infected_total += len(expected)
+        
+        assert infected_total > 0
+    
+    def test_radial_disaster_matches_scalar(self):
+        """Radial mortality kills the same individuals as the per-individual loop"""
+        rng = np.random.default_rng(5)
+        population = [Mock(position=tuple(xy)) for xy in rng.uniform(0, 100, (300, 2)).tolist()]
+        disaster = Disaster(
+            disaster_type=DisasterType.METEOR_IMPACT,
+            severity=0.9,
+            duration=1,
+            epicenter=(50, 50),
+            radius=30
+        )
+        mortality_rate = disaster.effects['instant_mortality']
+        module = sys.modules[DisasterSimulator.__module__]
+        
+        with patch.object(module, '_rng', np.random.default_rng(2)):
+            results = DisasterSimulator().apply_disaster(disaster, population, None)
+        
+        # Scalar baseline with the same per-individual draws
+        draws = np.random.default_rng(2).random(len(population)).tolist()
+        expected = []
+        for individual, draw in zip(population, draws):
+            distance = np.sqrt((individual.position[0] - 50) ** 2 + (individual.position[1] - 50) ** 2)
+            if draw < mortality_rate * max(0, 1 - distance / 30):
+                expected.append(individual)
+        
+        assert results['deaths'] == expected
+        assert expected  # Some die near the epicenter
+        for individual in results['deaths']:
+            assert np.hypot(individual.position[0] - 50, individual.position[1] - 50) < 30
+    
     def test_scenario_library(self):
         """Test pre-built scenarios"""
         kt = ScenarioLibrary.create_kt_extinction()
@@ -344,6 +517,16 @@ class TestDigitalEcosystem:
         # Population should change
         assert len(eco.populations["rabbit"]) != initial_rabbits or \
                len(eco.populations["fox"]) != 5
+    
+    def test_example_ecosystem_runs(self):
+        """Example ecosystem keeps running once organisms start starving"""
+        eco = create_example_ecosystem()
+        
+        for _ in range(25):
+            eco.simulate_step()
+        
+        assert eco.time_step == 25
+        assert sum(len(population) for population in eco.populations.values()) > 0
 
 
 class TestHorizontalGeneTransfer:
@@ -362,6 +545,55 @@ class TestHorizontalGeneTransfer:
         assert gene.is_compatible(Mock)
         assert gene.transfer_count == 0
     
+    def test_method_element_callable(self):
+        """Method elements compile to functions that only see safe builtins"""
+        gene = GeneticElement(
+            element_id="grow",
+            element_type="method",
+            source_species="bacteria",
+            code="def grow(self, steps):\n    return sum(range(steps)) + len(str(steps))",
+            metadata={}
+        )
+        
+        grow = gene.get_callable()
+        assert grow(None, 4) == 7
+        assert gene.get_callable() is grow
+        assert 'open' not in grow.__globals__['__builtins__']
+    
+    @pytest.mark.parametrize("body", [
+        'return __import__("os").getcwd()',
+        'return eval("1")',
+        'return open("/etc/passwd").read()',
+        'return self.__class__.__bases__',
+        'return __builtins__',
+        'import os\n    return os.getcwd()',
+    ])
+    def test_method_element_refuses_escapes(self, body):
+        """Method elements reaching for imports or interpreter internals are refused"""
+        gene = GeneticElement(
+            element_id="escape",
+            element_type="method",
+            source_species="bacteria",
+            code=f"def escape(self):\n    {body}",
+            metadata={}
+        )
+        
+        with pytest.raises(ValueError, match="forbidden"):
+            gene.get_callable()
+    
+    def test_method_element_has_no_unsafe_builtins(self):
+        """Builtins outside the allow-list are not in scope at run time"""
+        gene = GeneticElement(
+            element_id="peek",
+            element_type="method",
+            source_species="bacteria",
+            code="def peek(self):\n    return print",
+            metadata={}
+        )
+        
+        with pytest.raises(NameError):
+            gene.get_callable()(None)
+    
     def test_plasmid_transfer(self):
         """Test plasmid-mediated transfer"""
         plasmid = PlasmidVector("plasmid1", capacity=3)
@@ -433,6 +665,44 @@ class TestHorizontalGeneTransfer:
         
         # Conjugation might fail due to randomness, but system should work
         assert isinstance(success, bool)
+    
+    def test_uniform_grid_neighbors(self):
+        """Grid neighbours are exactly the organisms in conjugation range"""
+        rng = np.random.default_rng(0)
+        organisms = []
+        for i, (x, y) in enumerate(rng.uniform(-20, 20, (60, 2)).tolist()):
+            organism = LivingCodeOrganism(f"org{i}", "species_A")
+            organism.position = (x, y)
+            organisms.append(organism)
+        organisms[1].position = (organisms[0].position[0] + 5.0, organisms[0].position[1])
+        
+        grid = UniformGrid(organisms)
+        
+        for i, (x, y) in enumerate(grid.positions):
+            expected = [j for j, (ox, oy) in enumerate(grid.positions)
+                        if j != i and (ox - x) ** 2 + (oy - y) ** 2 <= 25.0]
+            assert sorted(grid.neighbors(i)) == expected
+    
+    def test_conjugation_step_pairs(self):
+        """conjugation_step only pairs capable donors with partners in range"""
+        network = HGTNetwork()
+        organisms = []
+        for i, position in enumerate([(0, 0), (3, 0), (100, 100), (0, 4)]):
+            organism = LivingCodeOrganism(f"org{i}", "species_A")
+            organism.position = position
+            organisms.append(organism)
+        organisms[3].conjugation_ability = False
+        
+        pairs = []
+        with patch.object(network, 'conjugation',
+                          side_effect=lambda donor, recipient: pairs.append((donor.id, recipient.id)) or True):
+            transfers = network.conjugation_step(organisms)
+        
+        assert transfers == len(pairs) == 2
+        donors = {donor for donor, _ in pairs}
+        assert donors == {"org0", "org1"}
+        for donor, recipient in pairs:
+            assert recipient in {"org0", "org1", "org3"} and recipient != donor
 
 
 class TestIntegration:
@@ -0,0 +1,61 @@
+"""
+Tests for logging configuration
+"""
+import logging
+import sys
+import os
+
+# Add old_structure to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'old_structure'))
+
+from utils.logging_config import _PreparedMemoryHandler
+
+
+class _ListHandler(logging.Handler):
+    """Collects formatted lines"""
+    
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+    
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+class TestBufferedHandler:
+    """Test the buffered main log file handler"""
+    
+    def _logger(self, target):
+        handler = _PreparedMemoryHandler(capacity=100, flushLevel=logging.CRITICAL, target=target)
+        logger = logging.getLogger(f"test_logging_config.{id(handler)}")
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        logger.addHandler(handler)
+        return logger, handler
+    
+    def test_args_rendered_at_log_time(self):
+        """Mutating an argument after the log call does not change the buffered line"""
+        target = _ListHandler()
+        logger, handler = self._logger(target)
+        payload = {'state': 'before'}
+        
+        logger.info("payload %s", payload)
+        payload['state'] = 'after'
+        handler.flush()
+        
+        assert target.lines == ["payload {'state': 'before'}"]
+    
+    def test_traceback_rendered_and_released(self):
+        """Buffered exception records keep the traceback text, not the frames"""
+        target = _ListHandler()
+        logger, handler = self._logger(target)
+        
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed")
+        
+        assert handler.buffer[0].exc_info is None
+        handler.flush()
+        assert target.lines[0].startswith("failed\nTraceback")
+        assert "ValueError: boom" in target.lines[0]